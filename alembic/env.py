@@ -26,6 +26,17 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# FTS5 virtual tables and their shadow tables are managed by hand in the
+# migrations, so autogenerate must not try to drop them.
+FULL_TEXT_SEARCH_TABLES = ("course_fts", "lesson_fts")
+
+
+def include_name(name: str, type_: str, parent_names: dict) -> bool:
+    if type_ == "table":
+        return not name.startswith(FULL_TEXT_SEARCH_TABLES)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -50,6 +61,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -61,6 +73,7 @@ def do_run_migrations(connection: Connection) -> None:
         connection=connection,
         target_metadata=target_metadata,
         render_as_batch=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,63 @@
+"""denormalize course_id on lesson and comment
+
+Revision ID: 8d4e6b2f0c31
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-18 11:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e6b2f0c31'
+down_revision: Union[str, None] = '3f1c2a7d9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('lesson', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('course_id', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('course_id', sa.Integer(), nullable=True))
+
+    op.execute(
+        'UPDATE lesson SET course_id = '
+        '(SELECT chapter.course_id FROM chapter '
+        'WHERE chapter.id = lesson.chapter_id)'
+    )
+    op.execute(
+        'UPDATE comment SET course_id = '
+        '(SELECT lesson.course_id FROM lesson '
+        'WHERE lesson.id = comment.lesson_id)'
+    )
+    # Rows whose chapter or lesson is already gone are unreachable and
+    # cannot satisfy the NOT NULL constraint below.
+    op.execute('DELETE FROM comment WHERE course_id IS NULL')
+    op.execute('DELETE FROM lesson WHERE course_id IS NULL')
+
+    with op.batch_alter_table('lesson', schema=None) as batch_op:
+        batch_op.alter_column('course_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_lesson_course_id'), ['course_id'], unique=False)
+        batch_op.create_foreign_key('fk_lesson_course_id_course', 'course', ['course_id'], ['id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.alter_column('course_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_comment_course_id'), ['course_id'], unique=False)
+        batch_op.create_foreign_key('fk_comment_course_id_course', 'course', ['course_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_comment_course_id_course', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_comment_course_id'))
+        batch_op.drop_column('course_id')
+
+    with op.batch_alter_table('lesson', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_lesson_course_id_course', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_lesson_course_id'))
+        batch_op.drop_column('course_id')
@@ -0,0 +1,52 @@
+"""never reuse course and lesson ids
+
+Revision ID: b76df41816cd
+Revises: 2665ca212cd5
+Create Date: 2026-10-18 09:30:12.418306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b76df41816cd'
+down_revision: Union[str, None] = '2665ca212cd5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def rebuild(table: str, autoincrement: bool) -> None:
+    # Rebuilding a table drops its triggers, so the full-text search ones
+    # are read back from the schema and created again as they were.
+    triggers = op.get_bind().exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' "
+        "AND tbl_name = ?",
+        (table,),
+    ).scalars().all()
+    with op.batch_alter_table(
+        table,
+        recreate='always',
+        table_kwargs={'sqlite_autoincrement': autoincrement},
+    ):
+        pass
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def upgrade() -> None:
+    # Only SQLite hands out the id of a deleted last row again.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    rebuild('course', True)
+    rebuild('lesson', True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    rebuild('lesson', False)
+    rebuild('course', False)
@@ -0,0 +1,114 @@
+"""full-text search over courses and lessons
+
+Revision ID: b7a9c3e15d42
+Revises: 8d4e6b2f0c31
+Create Date: 2026-10-18 12:25:03.671204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7a9c3e15d42'
+down_revision: Union[str, None] = '8d4e6b2f0c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# A frozen copy of FULL_TEXT_SEARCH_DDL in api/models.py as of this
+# revision, which stays the authoritative definition.
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE course_fts USING fts5(
+            name, description, content='course', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER course_fts_ai AFTER INSERT ON course BEGIN
+            INSERT INTO course_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER course_fts_ad AFTER DELETE ON course BEGIN
+            INSERT INTO course_fts(course_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER course_fts_au
+        AFTER UPDATE OF name, description ON course BEGIN
+            INSERT INTO course_fts(course_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO course_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE lesson_fts USING fts5(
+            name, content, content='lesson', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER lesson_fts_ai AFTER INSERT ON lesson BEGIN
+            INSERT INTO lesson_fts(rowid, name, content)
+            VALUES (new.id, new.name, new.content);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER lesson_fts_ad AFTER DELETE ON lesson BEGIN
+            INSERT INTO lesson_fts(lesson_fts, rowid, name, content)
+            VALUES ('delete', old.id, old.name, old.content);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER lesson_fts_au
+        AFTER UPDATE OF name, content ON lesson BEGIN
+            INSERT INTO lesson_fts(lesson_fts, rowid, name, content)
+            VALUES ('delete', old.id, old.name, old.content);
+            INSERT INTO lesson_fts(rowid, name, content)
+            VALUES (new.id, new.name, new.content);
+        END
+        """
+    )
+    op.execute("INSERT INTO course_fts(course_fts) VALUES ('rebuild')")
+    op.execute("INSERT INTO lesson_fts(lesson_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for trigger in (
+        'lesson_fts_au',
+        'lesson_fts_ad',
+        'lesson_fts_ai',
+        'course_fts_au',
+        'course_fts_ad',
+        'course_fts_ai',
+    ):
+        op.execute(f'DROP TRIGGER {trigger}')
+    op.execute('DROP TABLE lesson_fts')
+    op.execute('DROP TABLE course_fts')
@@ -0,0 +1,40 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends
+
+from ..auth.dependencies import get_jwt_service, is_admin
+from ..auth.hashing import hashing_executor
+from ..auth.token_service import AuthJWT
+from ..cache import caches
+from ..slow_queries import slow_query_log
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(is_admin)],
+)
+
+
+@router.get("/cache")
+async def get_cache_stats_handler(
+    jwt_service: Annotated[AuthJWT, Depends(get_jwt_service)],
+) -> dict[str, dict[str, int | float]]:
+    return {
+        **{name: cache.stats() for name, cache in caches.items()},
+        "verified_tokens": jwt_service.verified_tokens.stats(),
+    }
+
+
+@router.get("/hashing")
+async def get_hashing_stats_handler() -> dict[str, int]:
+    return hashing_executor.stats()
+
+
+@router.get("/slow-queries")
+async def get_slow_queries_handler() -> dict[str, Any]:
+    return {
+        "threshold": slow_query_log.threshold,
+        "recorded": slow_query_log.recorded,
+        "entries": slow_query_log.recent(),
+    }
@@ -4,7 +4,7 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .exceptions import InvalidPasswordOrUsername
+from .exceptions import InvalidPasswordOrUsername, NotAnAdmin
 from .schemas import LoginData, RefreshToken, UserOnRegister
 from .service import get_user, user_is_valid
 from .token_service import AuthJWT, TokenVerification
@@ -16,7 +16,7 @@ auth_scheme = OAuth2PasswordBearer(tokenUrl="jwt/create")
 
 class DatabaseSession:
     async def __call__(self, request: Request) -> AsyncSession:
-        return request.state.session
+        return request.state.lazy_session.get()
 
 
 class JWTServcie:
@@ -24,15 +24,25 @@ class JWTServcie:
         return request.state.jwt_service
 
 
+# FastAPI caches a dependency once per request by the identity of its
+# callable, so routes must share these instances instead of creating new
+# ones in every ``Depends``.
+get_session = DatabaseSession()
+get_jwt_service = JWTServcie()
+
+
 class UserExist:
     async def __call__(
         self,
+        request: Request,
         login_data: LoginData,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> User:
         user = await get_user(login_data, session)
         if user is None:
             raise InvalidPasswordOrUsername
+        # Logins carry no token, traffic capture reads the user from here.
+        request.state.subject = user.id
         return user
 
 
@@ -40,7 +50,7 @@ class UserNotExist:
     async def __call__(
         self,
         user_info: UserOnRegister,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> UserOnRegister:
 
         user_valid, message = await user_is_valid(user_info, session)
@@ -61,20 +71,40 @@ class RefreshConfiscationAgent:
 class TokenIsRefresh:
     async def __call__(
         self,
+        request: Request,
         token: Annotated[str, Depends(RefreshConfiscationAgent())],
-        jwt_service: Annotated[AuthJWT, Depends(JWTServcie())],
+        jwt_service: Annotated[AuthJWT, Depends(get_jwt_service)],
     ) -> dict[str, Any]:
-        return TokenVerification("refresh", jwt_service).validate_token(
+        payload = TokenVerification("refresh", jwt_service).validate_token(
             token
         )
+        request.state.subject = payload["id"]
+        return payload
 
 
 class IsAuthenticated:
     async def __call__(
         self,
         token: Annotated[str, Depends(auth_scheme)],
-        jwt_service: Annotated[AuthJWT, Depends(JWTServcie())],
+        jwt_service: Annotated[AuthJWT, Depends(get_jwt_service)],
     ) -> dict[str, Any]:
         return TokenVerification("access", jwt_service).validate_token(
             token
         )
+
+
+is_authenticated = IsAuthenticated()
+
+
+class IsAdmin:
+    async def __call__(
+        self,
+        request: Request,
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    ) -> dict[str, Any]:
+        if payload["id"] not in request.app.state.admin_ids:
+            raise NotAnAdmin
+        return payload
+
+
+is_admin = IsAdmin()
@@ -12,3 +12,14 @@ InvalidPasswordOrUsername = HTTPException(
     detail="Incorrect username or password",
     headers={"WWW-Authenticate": "Bearer"},
 )
+
+NotAnAdmin = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN,
+    detail="Not enough permissions",
+)
+
+HashingIsOverloaded = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Server is busy, try again later",
+    headers={"Retry-After": "1"},
+)
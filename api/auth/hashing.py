@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, TypeVar
+
+from .exceptions import HashingIsOverloaded
+from ..metrics.registry import hashing_duration, hashing_queue_wait
+
+
+T = TypeVar("T")
+
+
+def timed(func: Callable[..., T], *args: object) -> tuple[T, float, float]:
+    started = perf_counter()
+    result = func(*args)
+    return result, started, perf_counter() - started
+
+
+class HashingExecutor:
+    """Bounded thread pool that keeps bcrypt off the event loop.
+
+    Calls beyond ``max_queue`` pending jobs are rejected at once instead
+    of waiting behind the ones already queued.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 64) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hashing"
+        )
+
+    def configure(self, workers: int, max_queue: int) -> None:
+        self._executor.shutdown(wait=False)
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hashing"
+        )
+
+    async def run(self, func: Callable[..., T], *args: object) -> T:
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise HashingIsOverloaded
+
+        self.pending += 1
+        submitted = perf_counter()
+        try:
+            (
+                result,
+                started,
+                elapsed,
+            ) = await asyncio.get_running_loop().run_in_executor(
+                self._executor, timed, func, *args
+            )
+        finally:
+            self.pending -= 1
+
+        hashing_queue_wait.observe(started - submitted, func.__name__)
+        hashing_duration.observe(elapsed, func.__name__)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.pending,
+            "rejected": self.rejected,
+        }
+
+
+hashing_executor = HashingExecutor()
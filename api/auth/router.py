@@ -4,8 +4,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .dependencies import (
-    DatabaseSession,
-    JWTServcie,
+    get_jwt_service,
+    get_session,
     TokenIsRefresh,
     UserExist,
     UserNotExist,
@@ -21,7 +21,7 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 @router.post("/jwt/create")
 async def get_token(
     user: Annotated[User, Depends(UserExist())],
-    jwt_service: Annotated[AuthJWT, Depends(JWTServcie())],
+    jwt_service: Annotated[AuthJWT, Depends(get_jwt_service)],
 ) -> Tokens:
 
     payload = {
@@ -38,7 +38,7 @@ async def get_token(
 @router.post("/jwt/refresh")
 async def refresh_token(
     payload: Annotated[dict[str, Any], Depends(TokenIsRefresh())],
-    jwt_service: Annotated[AuthJWT, Depends(JWTServcie())],
+    jwt_service: Annotated[AuthJWT, Depends(get_jwt_service)],
 ) -> AccessToken:
 
     return AccessToken(access=jwt_service.create_access_token(payload))
@@ -47,7 +47,7 @@ async def refresh_token(
 @router.post("/register")
 async def register_user(
     user_info: Annotated[UserOnRegister, Depends(UserNotExist())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> UserInfo:
 
     return await create_user(user_info, session)
@@ -2,6 +2,7 @@ from passlib.context import CryptContext
 from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .hashing import hashing_executor
 from .schemas import LoginData, UserOnRegister
 from ..models import User
 
@@ -12,12 +13,12 @@ pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
 class Authorization:
 
     @staticmethod
-    def password_is_valid(password: str, user_password: str) -> bool:
-        return pwd.verify(password, user_password)
+    async def password_is_valid(password: str, user_password: str) -> bool:
+        return await hashing_executor.run(pwd.verify, password, user_password)
 
     @staticmethod
-    def get_password_hash(password: str) -> str:
-        return pwd.hash(password)
+    async def get_password_hash(password: str) -> str:
+        return await hashing_executor.run(pwd.hash, password)
 
 
 async def get_user(login_data: LoginData, session: AsyncSession) -> User:
@@ -26,7 +27,14 @@ async def get_user(login_data: LoginData, session: AsyncSession) -> User:
             User.username == login_data.username,
         )
     )
-    if Authorization.password_is_valid(login_data.password, user.password):
+    # Return the connection to the pool before waiting for the hashing
+    # executor, the detached user keeps its loaded columns.
+    await session.close()
+    if user is None:
+        return None
+    if await Authorization.password_is_valid(
+        login_data.password, user.password
+    ):
         return user
     return None
 
@@ -58,7 +66,12 @@ async def create_user(
     user_info: UserOnRegister, session: AsyncSession
 ) -> User:
 
-    user_info.password = Authorization.get_password_hash(user_info.password)
+    # The uniqueness checks began a transaction, it must not hold a pooled
+    # connection while the password is hashed.
+    await session.close()
+    user_info.password = await Authorization.get_password_hash(
+        user_info.password
+    )
     user = User(**user_info.model_dump())
     session.add(user)
     await session.commit()
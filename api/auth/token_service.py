@@ -1,11 +1,13 @@
 from calendar import timegm
 from datetime import datetime, timedelta
+from hashlib import sha256
 from typing import Any
 
 import jwt
 from jwt.exceptions import InvalidTokenError
 
 from .exceptions import InvalidToken
+from ..cache import LRUCache
 
 
 class AuthJWT:
@@ -13,9 +15,12 @@ class AuthJWT:
     access_token_expire_minutes = 30
     refresh_token_expire_minutes = 30 * 24 * 60
 
-    def __init__(self, secret_key: str, algorithm: str) -> None:
+    def __init__(
+        self, secret_key: str, algorithm: str, cache_size: int = 10000
+    ) -> None:
         self.secret_key = secret_key
         self.algorithm = algorithm
+        self.verified_tokens = LRUCache(maxsize=cache_size)
 
     def create_token(
         self, token_type: str, payload: dict[str, Any], exp_time: int
@@ -57,11 +62,21 @@ class TokenVerification:
         self.jwt_service = jwt_service
 
     def validate_token(self, token: str) -> dict[str, Any]:
-        payload = self.decrypted_token(token)
-        self.token_is_active(payload)
+        cache = self.jwt_service.verified_tokens
+        key = sha256(token.encode()).digest()
+
+        payload = cache.get(key)
+        if payload is None:
+            payload = self.decrypted_token(token)
+            self.token_is_active(payload)
+            cache.set(
+                key,
+                payload,
+                ttl=payload["exp"] - timegm(datetime.now().utctimetuple()),
+            )
         self.check_token_type(payload)
 
-        return payload
+        return payload.copy()
 
     def decrypted_token(self, token: str) -> dict[str, Any]:
         try:
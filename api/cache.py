@@ -0,0 +1,88 @@
+"""File to in-process caches for hot read paths."""
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from time import monotonic
+from typing import Any
+
+
+class LRUCache:
+    """Bounded LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def configure(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clear()
+
+    def get(self, key: Hashable) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at < monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self, key: Hashable, value: Any, ttl: float | None = None
+    ) -> None:
+        if ttl is None:
+            ttl = self.ttl
+        self._data[key] = (monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+catalog_cache = LRUCache()
+course_info_cache = LRUCache()
+course_outline_cache = LRUCache()
+enrollment_cache = LRUCache()
+course_id_cache = LRUCache()
+compressed_response_cache = LRUCache()
+
+caches = {
+    "catalog": catalog_cache,
+    "course_info": course_info_cache,
+    "course_outline": course_outline_cache,
+    "enrollments": enrollment_cache,
+    "course_ids": course_id_cache,
+    "compressed_responses": compressed_response_cache,
+}
@@ -0,0 +1,52 @@
+from datetime import date
+
+from .exceptions import DateRangeIsIncorrect, InvalidCursor
+from .schemas import CatalogFilters
+from .service import decode_cursor, decode_search_cursor
+
+
+class CatalogFiltersIsValid:
+
+    async def __call__(
+        self,
+        language: str | None = None,
+        started_after: date | None = None,
+        started_before: date | None = None,
+    ) -> CatalogFilters:
+        if (
+            started_after is not None
+            and started_before is not None
+            and started_after > started_before
+        ):
+            raise DateRangeIsIncorrect
+        return CatalogFilters(
+            language=language,
+            started_after=started_after,
+            started_before=started_before,
+        )
+
+
+class CursorIsValid:
+
+    async def __call__(
+        self, cursor: str | None = None
+    ) -> tuple[date, int] | None:
+        if cursor is None:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise InvalidCursor
+
+
+class SearchCursorIsValid:
+
+    async def __call__(
+        self, cursor: str | None = None
+    ) -> tuple[float, int] | None:
+        if cursor is None:
+            return None
+        try:
+            return decode_search_cursor(cursor)
+        except ValueError:
+            raise InvalidCursor
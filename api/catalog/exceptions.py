@@ -0,0 +1,11 @@
+from fastapi import HTTPException, status
+
+
+InvalidCursor = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+)
+
+
+DateRangeIsIncorrect = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Date range is incorrect"
+)
@@ -1,18 +1,53 @@
-from typing import Annotated
+from datetime import date
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .service import get_courses
-from ..auth.dependencies import DatabaseSession, IsAuthenticated
-from ..education.schemas import CoursePreview
+from .dependencies import (
+    CatalogFiltersIsValid,
+    CursorIsValid,
+    SearchCursorIsValid,
+)
+from .schemas import CatalogFilters, CoursesPage, SearchPage
+from .service import get_courses, get_courses_etag, search
+from ..auth.dependencies import get_session, is_authenticated
+from ..education.service import get_enrolled_course_ids
+from ..etag import check_etag
 
 
 router = APIRouter(prefix="/catalog", tags=["Catalog"])
 
 
-@router.get("", dependencies=[Depends(IsAuthenticated())])
+@router.get("", dependencies=[Depends(is_authenticated)])
 async def get_courses_handler(
-    session: Annotated[AsyncSession, Depends(DatabaseSession())]
-) -> list[CoursePreview]:
-    return await get_courses(session)
+    filters: Annotated[CatalogFilters, Depends(CatalogFiltersIsValid())],
+    cursor: Annotated[tuple[date, int] | None, Depends(CursorIsValid())],
+    request: Request,
+    response: Response,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> CoursesPage:
+    check_etag(
+        await get_courses_etag(session, filters, limit, cursor),
+        request,
+        response,
+    )
+    return await get_courses(session, filters, limit, cursor)
+
+
+@router.get("/search")
+async def search_handler(
+    q: Annotated[str, Query(max_length=256, pattern=r"\S")],
+    cursor: Annotated[
+        tuple[float, int] | None, Depends(SearchCursorIsValid())
+    ],
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    scope: Literal["courses", "lessons"] = "courses",
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> SearchPage:
+    course_ids = None
+    if scope == "lessons":
+        course_ids = await get_enrolled_course_ids(payload["id"], session)
+    return await search(session, q, scope, limit, cursor, course_ids)
@@ -0,0 +1,30 @@
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel
+
+from ..education.schemas import CoursePreview
+
+
+class CatalogFilters(BaseModel):
+    language: str | None = None
+    started_after: date | None = None
+    started_before: date | None = None
+
+
+class CoursesPage(BaseModel):
+    courses: list[CoursePreview]
+    next_cursor: str | None
+
+
+class SearchHit(BaseModel):
+    id: int
+    name: str
+    course_id: int
+    snippet: str
+
+
+class SearchPage(BaseModel):
+    scope: Literal["courses", "lessons"]
+    hits: list[SearchHit]
+    next_cursor: str | None
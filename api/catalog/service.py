@@ -1,8 +1,167 @@
-from sqlalchemy import select
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
+
+from sqlalchemy import func, literal_column, Select, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import Course
+from .schemas import CatalogFilters, CoursesPage, SearchHit, SearchPage
+from ..cache import catalog_cache
+from ..etag import make_etag
+from ..models import Course, course_fts, Lesson, lesson_fts
+
+
+def encode_cursor(course: Course) -> str:
+    raw = f"{course.date_started.isoformat()}:{course.id}"
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    date_started, course_id = (
+        urlsafe_b64decode(cursor.encode()).decode().split(":")
+    )
+    return date.fromisoformat(date_started), int(course_id)
+
+
+def encode_search_cursor(rank: float, row_id: int) -> str:
+    return urlsafe_b64encode(f"{rank!r}:{row_id}".encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    rank, row_id = urlsafe_b64decode(cursor.encode()).decode().split(":")
+    return float(rank), int(row_id)
+
+
+def apply_filters(st: Select, filters: CatalogFilters) -> Select:
+    if filters.language is not None:
+        st = st.where(Course.language == filters.language)
+    if filters.started_after is not None:
+        st = st.where(Course.date_started >= filters.started_after)
+    if filters.started_before is not None:
+        st = st.where(Course.date_started <= filters.started_before)
+    return st
+
+
+def courses_page_query(
+    st: Select,
+    filters: CatalogFilters,
+    limit: int,
+    cursor: tuple[date, int] | None = None,
+) -> Select:
+    if cursor is not None:
+        st = st.where(tuple_(Course.date_started, Course.id) > cursor)
+    return (
+        apply_filters(st, filters)
+        .order_by(Course.date_started, Course.id)
+        .limit(limit + 1)
+    )
+
+
+async def get_courses_etag(
+    session: AsyncSession,
+    filters: CatalogFilters,
+    limit: int,
+    cursor: tuple[date, int] | None = None,
+) -> str:
+    versions = await session.execute(
+        courses_page_query(
+            select(Course.id, Course.version), filters, limit, cursor
+        )
+    )
+    return make_etag("catalog", *map(tuple, versions))
+
+
+async def get_courses(
+    session: AsyncSession,
+    filters: CatalogFilters,
+    limit: int,
+    cursor: tuple[date, int] | None = None,
+) -> CoursesPage:
+    key = (*filters.model_dump().values(), limit, cursor)
+    page = catalog_cache.get(key)
+    if page is None:
+        page = await fetch_courses_page(session, filters, limit, cursor)
+        catalog_cache.set(key, page)
+    return page
+
+
+async def fetch_courses_page(
+    session: AsyncSession,
+    filters: CatalogFilters,
+    limit: int,
+    cursor: tuple[date, int] | None = None,
+) -> CoursesPage:
+    courses = list(
+        await session.scalars(
+            courses_page_query(select(Course), filters, limit, cursor)
+        )
+    )
+
+    next_cursor = None
+    if len(courses) > limit:
+        courses = courses[:limit]
+        next_cursor = encode_cursor(courses[-1])
+
+    return CoursesPage.model_validate(
+        {"courses": courses, "next_cursor": next_cursor},
+        from_attributes=True,
+    )
+
+
+def to_match_query(query: str) -> str:
+    """Turn user input into an FTS5 query of quoted terms.
+
+    Quoting keeps FTS5 operators typed by users from being parsed, and the
+    last term is matched as a prefix for search-as-you-type.
+    """
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in query.split()]
+    return " ".join(terms) + "*"
+
+
+async def search(
+    session: AsyncSession,
+    query: str,
+    scope: str,
+    limit: int,
+    cursor: tuple[float, int] | None = None,
+    course_ids: set[int] | None = None,
+) -> SearchPage:
+    if scope == "courses":
+        model, course_id, fts_table = Course, Course.id, course_fts
+    else:
+        model, course_id, fts_table = Lesson, Lesson.course_id, lesson_fts
+
+    fts = literal_column(fts_table.name)
+    rank = func.bm25(fts)
+    st = (
+        select(
+            model.id,
+            model.name,
+            course_id,
+            func.snippet(fts, -1, "<mark>", "</mark>", "…", 16),
+            rank,
+        )
+        .join(fts_table, fts_table.c.rowid == model.id)
+        .where(fts.match(to_match_query(query)))
+        .order_by(rank, model.id)
+        .limit(limit + 1)
+    )
+    if course_ids is not None:
+        st = st.where(course_id.in_(course_ids))
+    if cursor is not None:
+        st = st.where(tuple_(rank, model.id) > cursor)
+
+    rows = (await session.execute(st)).all()
 
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1][4], rows[-1][0])
 
-async def get_courses(session: AsyncSession) -> list[Course]:
-    return await session.scalars(select(Course))
+    return SearchPage(
+        scope=scope,
+        hits=[
+            SearchHit(id=id_, name=name, course_id=course_id, snippet=text)
+            for id_, name, course_id, text, _ in rows
+        ],
+        next_cursor=next_cursor,
+    )
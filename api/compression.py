@@ -0,0 +1,75 @@
+"""File to negotiated response compression."""
+
+from collections.abc import Callable
+from functools import partial
+import gzip
+
+from fastapi import Request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+# In order of server preference when the client accepts several equally.
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = zstandard.ZstdCompressor(level=3).compress
+if brotli is not None:
+    ENCODERS["br"] = partial(brotli.compress, quality=4)
+ENCODERS["gzip"] = partial(gzip.compress, compresslevel=6, mtime=0)
+
+
+def parse_quality(params: str) -> float:
+    name, _, value = params.strip().partition("=")
+    if name.strip() != "q":
+        return 1.0
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        accepted[coding.strip().lower()] = parse_quality(params)
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = parse_accept_encoding(accept_encoding)
+    default = accepted.get("*", 0.0)
+    encoding = max(ENCODERS, key=lambda name: accepted.get(name, default))
+    if accepted.get(encoding, default) <= 0:
+        return None
+    return encoding
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class SkipCompression:
+    """Dependency for routes whose responses must not be compressed."""
+
+    async def __call__(self, request: Request) -> None:
+        request.state.compress = False
+
+
+skip_compression = SkipCompression()
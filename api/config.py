@@ -1,5 +1,7 @@
 """File for load config data."""
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,3 +11,29 @@ class Config(BaseSettings):
     JWTALGORITHM: str = "HSA256"
     HOST: str = "0.0.0.0"
     PORT: int
+    CACHEMAXSIZE: int = 1024
+    CACHETTL: int = 60
+    HASHWORKERS: int = 4
+    HASHQUEUESIZE: int = 64
+    TOKENCACHESIZE: int = 10000
+    COMPRESSIONMINSIZE: int = 512
+    DBPOOLSIZE: int = 5
+    DBMAXOVERFLOW: int = 10
+    DBPOOLTIMEOUT: float = 30
+    DBPOOLRECYCLE: int = -1
+    DBPOOLPREPING: bool = False
+    DBREADURL: str | None = None
+    DBREADPOOLSIZE: int = 10
+    DBREADMAXOVERFLOW: int = 20
+    SQLITEJOURNALMODE: Literal[
+        "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"
+    ] = "WAL"
+    SQLITESYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITEBUSYTIMEOUT: int = 5000
+    SQLITEMMAPSIZE: int = 268435456
+    SQLITECACHESIZE: int = -65536
+    SLOWQUERYTHRESHOLD: float = 0.1
+    SLOWQUERYLOGSIZE: int = 100
+    SLOWQUERYLOGFILE: str | None = None
+    TRAFFICCAPTUREFILE: str | None = None
+    ADMINIDS: list[int] = []
@@ -1,18 +1,207 @@
 """File for connect with database."""
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, make_url, URL
+from sqlalchemy.engine.interfaces import (
+    DBAPIConnection,
+    DBAPICursor,
+    ExecutionContext,
+)
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    AsyncEngine,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from .metrics.registry import db_pool_checkout_duration, db_query_duration
+from .slow_queries import slow_query_log
 
 
 class Base(DeclarativeBase):
     pass
 
 
-class Database:
-    def __init__(self, db_url: str) -> None:
-        self.engine = create_async_engine(
-            db_url, connect_args={"check_same_thread": False}
+class SQLitePragmas:
+    """Connect hook that applies PRAGMA statements to SQLite connections.
+
+    Most of them are per connection, so they are applied to every new
+    connection the pool opens.
+    """
+
+    def __init__(self, pragmas: dict[str, str | int]) -> None:
+        self.pragmas = pragmas
+
+    def __call__(
+        self,
+        dbapi_connection: DBAPIConnection,
+        connection_record: ConnectionPoolEntry,
+    ) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in self.pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class QueryTimer:
+    """Cursor execute hooks recording statement durations per engine.
+
+    Statements over the slow query threshold also go to the slow query log.
+    """
+
+    def __init__(self, engine_name: str) -> None:
+        self.engine_name = engine_name
+
+    def before(
+        self,
+        conn: Connection,
+        cursor: DBAPICursor,
+        statement: str,
+        parameters: object,
+        context: ExecutionContext | None,
+        executemany: bool,
+    ) -> None:
+        conn.info["query_started"] = perf_counter()
+
+    def after(
+        self,
+        conn: Connection,
+        cursor: DBAPICursor,
+        statement: str,
+        parameters: object,
+        context: ExecutionContext | None,
+        executemany: bool,
+    ) -> None:
+        elapsed = perf_counter() - conn.info.pop("query_started")
+        operation = statement.lstrip().split(None, 1)[0].upper()
+        db_query_duration.observe(elapsed, self.engine_name, operation)
+        if elapsed >= slow_query_log.threshold:
+            slow_query_log.record(
+                conn,
+                statement,
+                parameters,
+                executemany,
+                elapsed,
+                self.engine_name,
+            )
+
+    def listen(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, "before_cursor_execute", self.before)
+        event.listen(engine.sync_engine, "after_cursor_execute", self.after)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool recording how long checkouts wait for a connection."""
+
+    engine_name = "default"
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_duration.observe(
+                perf_counter() - started, self.engine_name
+            )
+
+
+def is_sqlite_file(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def read_only_url(url: URL) -> URL | None:
+    """SQLite URI opening the same database file read-only."""
+    if not is_sqlite_file(url):
+        return None
+    return url.set(
+        database=f"file:{url.database}",
+        query={**url.query, "mode": "ro", "uri": "true"},
+    )
+
+
+def make_engine(
+    url: URL,
+    name: str,
+    pool_options: dict[str, Any] | None = None,
+    sqlite_pragmas: dict[str, str | int] | None = None,
+) -> AsyncEngine:
+    is_sqlite = url.get_backend_name() == "sqlite"
+
+    connect_args = {}
+    engine_options = dict(pool_options or {})
+    if is_sqlite:
+        connect_args["check_same_thread"] = False
+    if is_sqlite and not is_sqlite_file(url):
+        # In-memory databases live in one connection of a StaticPool,
+        # which takes no pool sizing options.
+        engine_options = {}
+    else:
+        # Also for SQLite files: aiosqlite opens a connection per checkout
+        # by default, which throws away the page cache and mmap of each.
+        engine_options["poolclass"] = type(
+            f"{name.title()}QueuePool",
+            (InstrumentedQueuePool,),
+            {"engine_name": name},
+        )
+
+    engine = create_async_engine(
+        url, connect_args=connect_args, **engine_options
+    )
+    if is_sqlite and sqlite_pragmas:
+        event.listen(
+            engine.sync_engine, "connect", SQLitePragmas(sqlite_pragmas)
         )
+    QueryTimer(name).listen(engine)
+    return engine
+
+
+class Database:
+    """Writer engine plus a read-only engine for GET requests.
+
+    The reader is ``read_db_url`` when given, such as a replica, or else the
+    SQLite database file opened ``mode=ro``. Other databases without a
+    read URL share the writer engine.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        pool_options: dict[str, Any] | None = None,
+        sqlite_pragmas: dict[str, str | int] | None = None,
+        read_db_url: str | None = None,
+        read_pool_options: dict[str, Any] | None = None,
+    ) -> None:
+        url = make_url(db_url)
+        self.engine = make_engine(url, "writer", pool_options, sqlite_pragmas)
+
+        read_url = make_url(read_db_url) if read_db_url else read_only_url(url)
+        if read_url is None:
+            self.read_engine = self.engine
+        else:
+            # The journal mode is the writer's to set, read-only
+            # connections cannot change it.
+            self.read_engine = make_engine(
+                read_url,
+                "reader",
+                read_pool_options,
+                {
+                    name: value
+                    for name, value in (sqlite_pragmas or {}).items()
+                    if name != "journal_mode"
+                },
+            )
+
         self.session = async_sessionmaker(
             autocommit=False, autoflush=False, bind=self.engine
         )
+        self.read_session = async_sessionmaker(
+            autocommit=False, autoflush=False, bind=self.read_engine
+        )
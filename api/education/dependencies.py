@@ -13,9 +13,9 @@ from .exceptions import (
     ReviewDoesNotExist,
     UserHasNotAccess,
 )
-from .models import UserCourse
 from .schemas import CommentOnCreate, ReviewOnCreate
-from ..auth.dependencies import DatabaseSession, IsAuthenticated
+from .service import get_course_id, get_enrolled_course_ids
+from ..auth.dependencies import get_session, is_authenticated
 from ..models import Chapter, Comment, Course, Lesson, Review
 
 
@@ -24,7 +24,7 @@ class CourseExistBody:
     async def __call__(
         self,
         review: ReviewOnCreate,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
         if not await session.scalar(
             select(exists().where(Course.id == review.course_id))
@@ -38,7 +38,7 @@ class CourseExistPathParam:
     async def __call__(
         self,
         course_id: int,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
         if not await session.scalar(
             select(exists().where(Course.id == course_id))
@@ -47,84 +47,37 @@ class CourseExistPathParam:
         return course_id
 
 
-class ChapterExist:
+class HasAccessToChapter:
 
     async def __call__(
         self,
         chapter_id: int,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
-        if not await session.scalar(
-            select(Chapter).where(Chapter.id == chapter_id)
-        ):
+        course_id = await get_course_id(Chapter, chapter_id, session)
+        if course_id is None:
             raise ChapterDoesNotExist
-        return chapter_id
-
-
-class HasAccessToChapter:
-
-    async def __call__(
-        self,
-        payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-        chapter_id: Annotated[int, Depends(ChapterExist())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
-    ) -> int:
-        course_id = (
-            select(Chapter.id)
-            .where(Chapter.id == chapter_id)
-            .scalar_subquery()
-        )
-        if not await session.scalar(
-            select(
-                exists().where(
-                    UserCourse.user_id == payload["id"],
-                    UserCourse.course_id == course_id,
-                )
-            )
+        if course_id not in await get_enrolled_course_ids(
+            payload["id"], session
         ):
             raise UserHasNotAccess
         return chapter_id
 
 
-class LessonExist:
+class HasAccessToLesson:
 
     async def __call__(
         self,
         lesson_id: int,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        paylaod: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
-        if not await session.scalar(
-            select(Lesson).where(Lesson.id == lesson_id)
-        ):
+        course_id = await get_course_id(Lesson, lesson_id, session)
+        if course_id is None:
             raise LessonDoesNotExist
-        return lesson_id
-
-
-class HasAccessToLesson:
-
-    async def __call__(
-        self,
-        lesson_id: Annotated[int, Depends(LessonExist())],
-        paylaod: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
-    ) -> int:
-        chapter_id = (
-            select(Lesson.chapter_id)
-            .where(Lesson.id == lesson_id)
-            .scalar_subquery()
-        )
-        course_id = (
-            select(Chapter.course_id)
-            .where(Chapter.id == chapter_id)
-            .scalar_subquery()
-        )
-        if not await session.scalar(
-            select(
-                exists().where(
-                    UserCourse.user_id == paylaod["id"],
-                    UserCourse.course_id == course_id,
-                )
-            )
+        if course_id not in await get_enrolled_course_ids(
+            paylaod["id"], session
         ):
             raise UserHasNotAccess
         return lesson_id
@@ -136,27 +89,37 @@ class HasAccessToCourse:
         self,
         review: ReviewOnCreate,
         course_id: Annotated[int, Depends(CourseExistBody())],
-        payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> ReviewOnCreate:
-        if not await session.scalar(
-            select(
-                exists().where(
-                    UserCourse.user_id == payload["id"],
-                    UserCourse.course_id == course_id,
-                )
-            )
+        if course_id not in await get_enrolled_course_ids(
+            payload["id"], session
         ):
             raise UserHasNotAccess
         return review
 
 
+class HasAccessToCoursePathParam:
+
+    async def __call__(
+        self,
+        course_id: Annotated[int, Depends(CourseExistPathParam())],
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
+    ) -> int:
+        if course_id not in await get_enrolled_course_ids(
+            payload["id"], session
+        ):
+            raise UserHasNotAccess
+        return course_id
+
+
 class ReviewIsExist:
 
     async def __call__(
         self,
         review_id: int,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
         if not await session.scalar(
             select(exists().where(Review.id == review_id))
@@ -170,8 +133,8 @@ class IsReviewAuthor:
     async def __call__(
         self,
         review_id: Annotated[int, Depends(ReviewIsExist())],
-        payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
         if not await session.scalar(
             select(
@@ -189,8 +152,8 @@ class IsCommentAuthor:
     async def __call__(
         self,
         comment_id: int,
-        payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
         if not await session.scalar(
             select(
@@ -210,7 +173,7 @@ class CommentIsValid:
         self,
         lesson_id: Annotated[int, Depends(HasAccessToLesson())],
         comment: CommentOnCreate,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> CommentOnCreate:
         if comment.parent_comment_id is not None and not await session.scalar(
             select(
@@ -229,7 +192,7 @@ class CommentIsExist:
     async def __call__(
         self,
         comment_id: int,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
         if not await session.scalar(
             select(exists().where(Comment.id == comment_id))
@@ -242,32 +205,17 @@ class HasAccessToComment:
 
     async def __call__(
         self,
-        comment_id: Annotated[int, Depends(CommentIsExist())],
-        payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        comment_id: int,
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
-        lesson_id = (
-            select(Comment.lesson_id)
-            .where(Comment.id == comment_id)
-            .scalar_subquery()
-        )
-        chapter_id = (
-            select(Lesson.chapter_id)
-            .where(Lesson.id == lesson_id)
-            .scalar_subquery()
+        course_id = await session.scalar(
+            select(Comment.course_id).where(Comment.id == comment_id)
         )
-        course_id = (
-            select(Chapter.course_id)
-            .where(Chapter.id == chapter_id)
-            .scalar_subquery()
-        )
-        if not await session.scalar(
-            select(
-                exists().where(
-                    UserCourse.course_id == course_id,
-                    UserCourse.user_id == payload["id"],
-                )
-            )
+        if course_id is None:
+            raise CommentDoesNotExist
+        if course_id not in await get_enrolled_course_ids(
+            payload["id"], session
         ):
             raise UserHasNotAccess
         return comment_id
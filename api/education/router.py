@@ -1,6 +1,6 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .dependencies import (
@@ -10,6 +10,7 @@ from .dependencies import (
     CourseExistPathParam,
     HasAccessToChapter,
     HasAccessToCourse,
+    HasAccessToCoursePathParam,
     HasAccessToLesson,
     IsCommentAuthor,
     IsReviewAuthor,
@@ -18,7 +19,9 @@ from .schemas import (
     CommentOnAnswer,
     CommentOnCreate,
     CommentOnUpdate,
+    CommentThreadPage,
     CourseInfo,
+    CourseOutline,
     CoursePreview,
     LessonInfo,
     LessonPreview,
@@ -32,17 +35,23 @@ from .service import (
     create_review,
     delete_comment,
     delete_review,
+    get_comment_thread,
     get_comments,
+    get_course_etag,
     get_course_info,
+    get_course_outline,
     get_course_reviews,
     get_lesson,
+    get_lesson_etag,
     get_lessons,
     get_subcomments,
     get_user_courses,
     update_comment,
     update_reveiw,
 )
-from ..auth.dependencies import DatabaseSession, IsAuthenticated
+from ..auth.dependencies import get_session, is_authenticated
+from ..etag import check_etag
+from ..serialization import JSONSerializer
 
 
 router = APIRouter(
@@ -50,67 +59,96 @@ router = APIRouter(
     tags=["Education"],
 )
 
+courses_serializer = JSONSerializer(list[CoursePreview])
+lessons_serializer = JSONSerializer(list[LessonPreview])
+reviews_serializer = JSONSerializer(list[ReviewOnAnswer])
+comments_serializer = JSONSerializer(list[CommentOnAnswer])
 
-@router.get("/courses")
+
+@router.get("/courses", response_model=list[CoursePreview])
 async def get_courses_handler(
-    payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
-) -> list[CoursePreview]:
-    return await get_user_courses(payload["id"], session)
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Response:
+    return courses_serializer.response(
+        await get_user_courses(payload["id"], session)
+    )
 
 
 @router.post("/add-course")
 async def add_course_handler(
     course_id: Annotated[int, Depends(CourseExistBody())],
-    payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Response:
     await add_course_for_education(payload["id"], course_id, session)
 
     return Response(status_code=status.HTTP_201_CREATED)
 
 
-@router.get("/course/{course_id}", dependencies=[Depends(IsAuthenticated())])
+@router.get("/course/{course_id}", dependencies=[Depends(is_authenticated)])
 async def get_course_handler(
     course_id: Annotated[int, Depends(CourseExistPathParam())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    request: Request,
+    response: Response,
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> CourseInfo:
+    check_etag(await get_course_etag(course_id, session), request, response)
     return await get_course_info(course_id, session)
 
 
 @router.get(
-    "/chapter/{chapter_id}/lessons", dependencies=[Depends(IsAuthenticated())]
+    "/course/{course_id}/outline", dependencies=[Depends(is_authenticated)]
+)
+async def get_course_outline_handler(
+    course_id: Annotated[int, Depends(HasAccessToCoursePathParam())],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> CourseOutline:
+    return await get_course_outline(course_id, session)
+
+
+@router.get(
+    "/chapter/{chapter_id}/lessons",
+    dependencies=[Depends(is_authenticated)],
+    response_model=list[LessonPreview],
 )
 async def get_lessons_handler(
     chapter_id: Annotated[int, Depends(HasAccessToChapter())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
-) -> list[LessonPreview]:
-    return await get_lessons(chapter_id, session)
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Response:
+    return lessons_serializer.response(await get_lessons(chapter_id, session))
 
 
-@router.get("/lesson/{lesson_id}", dependencies=[Depends(IsAuthenticated())])
+@router.get("/lesson/{lesson_id}", dependencies=[Depends(is_authenticated)])
 async def get_lesson_handler(
     lesson_id: Annotated[int, Depends(HasAccessToLesson())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    request: Request,
+    response: Response,
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> LessonInfo:
+    check_etag(await get_lesson_etag(lesson_id, session), request, response)
     return await get_lesson(lesson_id, session)
 
 
 @router.get(
-    "/course/{course_id}/reviews", dependencies=[Depends(IsAuthenticated())]
+    "/course/{course_id}/reviews",
+    dependencies=[Depends(is_authenticated)],
+    response_model=list[ReviewOnAnswer],
 )
 async def get_course_reviews_handler(
     course_id: Annotated[int, Depends(CourseExistPathParam())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
-) -> list[ReviewOnAnswer]:
-    return await get_course_reviews(course_id, session)
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Response:
+    return reviews_serializer.response(
+        await get_course_reviews(course_id, session)
+    )
 
 
 @router.post("/review")
 async def create_review_handler(
     review: Annotated[ReviewOnCreate, Depends(HasAccessToCourse())],
-    payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> ReviewOnAnswer:
     return await create_review(review, payload["id"], session)
 
@@ -119,7 +157,7 @@ async def create_review_handler(
 async def update_review_handler(
     review_id: Annotated[int, Depends(IsReviewAuthor())],
     review_data: ReviewOnUpdate,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> ReviewOnAnswer:
     return await update_reveiw(review_id, review_data, session)
 
@@ -127,7 +165,7 @@ async def update_review_handler(
 @router.delete("/review/{review_id}")
 async def delete_review_handler(
     review_id: Annotated[int, Depends(IsReviewAuthor())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Response:
 
     await delete_review(review_id, session)
@@ -136,38 +174,57 @@ async def delete_review_handler(
 
 
 @router.get(
-    "/lesson/{lesson_id}/comments", dependencies=[Depends(IsAuthenticated())]
+    "/lesson/{lesson_id}/comments",
+    dependencies=[Depends(is_authenticated)],
+    response_model=list[CommentOnAnswer],
 )
 async def get_comments_handler(
     lesson_id: Annotated[int, Depends(HasAccessToLesson())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
-) -> list[CommentOnAnswer]:
-    return await get_comments(lesson_id, session)
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Response:
+    return comments_serializer.response(await get_comments(lesson_id, session))
+
+
+@router.get(
+    "/lesson/{lesson_id}/thread", dependencies=[Depends(is_authenticated)]
+)
+async def get_comment_thread_handler(
+    lesson_id: Annotated[int, Depends(HasAccessToLesson())],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    cursor: int | None = None,
+    depth: Annotated[int | None, Query(ge=0)] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> CommentThreadPage:
+    return await get_comment_thread(lesson_id, session, limit, cursor, depth)
 
 
 @router.post("/lesson/{lesson_id}/comment")
 async def create_comment_handler(
     comment: Annotated[CommentOnCreate, Depends(CommentIsValid())],
     lesson_id: int,
-    payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> CommentOnAnswer:
     return await create_comment(comment, lesson_id, payload["id"], session)
 
 
-@router.get("/comment/{comment_id}/subcomments")
+@router.get(
+    "/comment/{comment_id}/subcomments", response_model=list[CommentOnAnswer]
+)
 async def get_subcomments_handler(
     comment_id: Annotated[int, Depends(CommentIsExist())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
-) -> list[CommentOnAnswer]:
-    return await get_subcomments(comment_id, session)
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Response:
+    return comments_serializer.response(
+        await get_subcomments(comment_id, session)
+    )
 
 
 @router.put("/comment/{comment_id}")
 async def update_comment_handler(
     comment_id: Annotated[int, Depends(IsCommentAuthor())],
     comment_changes: CommentOnUpdate,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> CommentOnAnswer:
     return await update_comment(comment_id, comment_changes, session)
 
@@ -175,7 +232,7 @@ async def update_comment_handler(
 @router.delete("/comment/{comment_id}")
 async def delete_comment_handler(
     comment_id: Annotated[int, Depends(IsCommentAuthor())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Response:
     await delete_comment(comment_id, session)
 
@@ -45,6 +45,14 @@ class LessonInfo(LessonPreview):
     content: str
 
 
+class ChapterOutline(ChapterPreview):
+    lessons: list[LessonPreview]
+
+
+class CourseOutline(CoursePreview):
+    chapters: list[ChapterOutline]
+
+
 class ReviewOnCreate(BaseModel):
     text: str = Field(max_length=4096)
     course_id: int
@@ -70,3 +78,12 @@ class CommentOnCreate(CommentOnUpdate):
 class CommentOnAnswer(CommentOnCreate):
     id: int
     author: AuthorPreview
+
+
+class CommentThread(CommentOnAnswer):
+    replies: list["CommentThread"] = []
+
+
+class CommentThreadPage(BaseModel):
+    comments: list[CommentThread]
+    next_cursor: int | None
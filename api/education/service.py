@@ -1,4 +1,4 @@
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import delete, insert, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
@@ -6,35 +6,142 @@ from .models import UserCourse
 from .schemas import (
     CommentOnCreate,
     CommentOnUpdate,
+    CommentThread,
+    CommentThreadPage,
+    CourseInfo,
+    CourseOutline,
     ReviewOnCreate,
     ReviewOnUpdate,
 )
-from ..models import Comment, Course, Lesson, Review
+from ..cache import (
+    course_id_cache,
+    course_info_cache,
+    course_outline_cache,
+    enrollment_cache,
+)
+from ..etag import make_etag
+from ..models import Chapter, Comment, Course, Lesson, Review
 
 
 async def get_user_courses(
     user_id: int, session: AsyncSession
 ) -> list[Course]:
     return await session.scalars(
-        select(UserCourse)
+        select(Course)
+        .join(UserCourse, UserCourse.course_id == Course.id)
         .where(UserCourse.user_id == user_id)
-        .options(joinedload(UserCourse.courses))
     )
 
 
+async def get_enrolled_course_ids(
+    user_id: int, session: AsyncSession
+) -> set[int]:
+    course_ids = enrollment_cache.get(user_id)
+    if course_ids is None:
+        course_ids = set(
+            await session.scalars(
+                select(UserCourse.course_id).where(
+                    UserCourse.user_id == user_id
+                )
+            )
+        )
+        enrollment_cache.set(user_id, course_ids)
+    return course_ids
+
+
+async def get_course_id(
+    model: type[Chapter] | type[Lesson], item_id: int, session: AsyncSession
+) -> int | None:
+    """Course of a chapter or lesson, cached as they never change course."""
+    key = (model.__tablename__, item_id)
+    course_id = course_id_cache.get(key)
+    if course_id is None:
+        course_id = await session.scalar(
+            select(model.course_id).where(model.id == item_id)
+        )
+        if course_id is not None:
+            course_id_cache.set(key, course_id)
+    return course_id
+
+
 async def add_course_for_education(
     user_id: int, course_id: int, session: AsyncSession
 ) -> None:
     session.add(UserCourse(user_id=user_id, course_id=course_id))
     await session.commit()
 
+    course_ids = enrollment_cache.get(user_id)
+    if course_ids is not None:
+        course_ids.add(course_id)
 
-async def get_course_info(course_id: int, session: AsyncSession) -> Course:
-    return await session.scalar(
-        select(Course)
-        .where(Course.id == course_id)
-        .options(joinedload(Course.chapters), joinedload(Course.author))
+
+async def get_course_etag(course_id: int, session: AsyncSession) -> str:
+    version = await session.scalar(
+        select(Course.version).where(Course.id == course_id)
     )
+    return make_etag("course", course_id, version)
+
+
+async def get_course_info(
+    course_id: int, session: AsyncSession
+) -> CourseInfo:
+    course_info = course_info_cache.get(course_id)
+    if course_info is None:
+        course = await session.scalar(
+            select(Course)
+            .where(Course.id == course_id)
+            .options(joinedload(Course.chapters), joinedload(Course.author))
+        )
+        course_info = CourseInfo.model_validate(course, from_attributes=True)
+        course_info_cache.set(course_id, course_info)
+    return course_info
+
+
+def order_by_sequence(items: list, sequence: list[int]) -> list:
+    position = {item_id: index for index, item_id in enumerate(sequence)}
+    return sorted(
+        items, key=lambda item: (position.get(item.id, len(position)), item.id)
+    )
+
+
+async def get_course_outline(
+    course_id: int, session: AsyncSession
+) -> CourseOutline:
+    course_outline = course_outline_cache.get(course_id)
+    if course_outline is None:
+        course = await session.scalar(
+            select(Course)
+            .where(Course.id == course_id)
+            .options(
+                joinedload(Course.chapters)
+                .selectinload(Chapter.lessons)
+                .load_only(Lesson.id, Lesson.name)
+            )
+        )
+        course_outline = CourseOutline.model_validate(
+            {
+                "id": course.id,
+                "name": course.name,
+                "avatar": course.avatar,
+                "chapters": [
+                    {
+                        "id": chapter.id,
+                        "name": chapter.name,
+                        "description": chapter.description,
+                        "avatar": chapter.avatar,
+                        "lessons": order_by_sequence(
+                            chapter.lessons, chapter.lessons_sequence
+                        ),
+                    }
+                    for chapter in order_by_sequence(
+                        course.chapters, course.chapters_sequense
+                    )
+                ],
+            },
+            from_attributes=True,
+        )
+        course_outline_cache.set(course_id, course_outline)
+    return course_outline
 
 
 async def get_lessons(chapter_id: int, session: AsyncSession) -> list[Lesson]:
@@ -43,6 +150,13 @@ async def get_lessons(chapter_id: int, session: AsyncSession) -> list[Lesson]:
     )
 
 
+async def get_lesson_etag(lesson_id: int, session: AsyncSession) -> str:
+    version = await session.scalar(
+        select(Lesson.version).where(Lesson.id == lesson_id)
+    )
+    return make_etag("lesson", lesson_id, version)
+
+
 async def get_lesson(lesson_id: int, session: AsyncSession) -> Lesson:
     return await session.scalar(select(Lesson).where(Lesson.id == lesson_id))
 
@@ -99,11 +213,74 @@ async def get_comments(lesson_id: int, session: AsyncSession) -> list[Comment]:
     return await session.scalars(
         select(Comment)
         .where(
-            Comment.lesson_id == lesson_id, Comment.parent_comment_id is None
+            Comment.lesson_id == lesson_id, Comment.parent_comment_id.is_(None)
+        )
+        .options(joinedload(Comment.author))
+    )
+
+
+def nest_comments(comments: list[Comment]) -> list[CommentThread]:
+    """Comments ordered by id as trees, a reply always follows its parent."""
+    nodes = {
+        comment.id: CommentThread.model_validate(comment, from_attributes=True)
+        for comment in comments
+    }
+    top_level = []
+    for node in nodes.values():
+        if node.parent_comment_id in nodes:
+            nodes[node.parent_comment_id].replies.append(node)
+        else:
+            top_level.append(node)
+    return top_level
+
+
+async def get_comment_thread(
+    lesson_id: int,
+    session: AsyncSession,
+    limit: int,
+    cursor: int | None = None,
+    depth: int | None = None,
+) -> CommentThreadPage:
+    roots = (
+        select(Comment.id)
+        .where(
+            Comment.lesson_id == lesson_id, Comment.parent_comment_id.is_(None)
         )
+        .order_by(Comment.id)
+    )
+    if cursor is not None:
+        roots = roots.where(Comment.id > cursor)
+
+    thread = (
+        select(Comment.id, literal(0).label("depth"), Comment.id.label("root"))
+        .where(Comment.id.in_(roots.limit(limit + 1)))
+        .cte("thread", recursive=True)
+    )
+    # The extra root only tells whether there is a next page, its replies
+    # are not loaded.
+    replies = (
+        select(Comment.id, thread.c.depth + 1, thread.c.root)
+        .join(thread, Comment.parent_comment_id == thread.c.id)
+        .where(thread.c.root.in_(roots.limit(limit)))
+    )
+    if depth is not None:
+        replies = replies.where(thread.c.depth < depth)
+    thread = thread.union_all(replies)
+
+    comments = await session.scalars(
+        select(Comment)
+        .join(thread, Comment.id == thread.c.id)
         .options(joinedload(Comment.author))
+        .order_by(Comment.id)
     )
 
+    top_level = nest_comments(comments)
+    next_cursor = None
+    if len(top_level) > limit:
+        top_level = top_level[:limit]
+        next_cursor = top_level[-1].id
+    return CommentThreadPage(comments=top_level, next_cursor=next_cursor)
+
 
 async def get_subcomments(
     comment_id: int, session: AsyncSession
@@ -126,6 +303,9 @@ async def create_comment(
         .values(
             **comment_data.model_dump(),
             lesson_id=lesson_id,
+            course_id=select(Lesson.course_id)
+            .where(Lesson.id == lesson_id)
+            .scalar_subquery(),
             author_id=author_id
         )
         .returning(Comment)
@@ -0,0 +1,32 @@
+"""File to conditional GET helpers."""
+
+from collections.abc import Hashable
+from hashlib import sha1
+
+from fastapi import HTTPException, Request, Response, status
+
+
+class NotModified(HTTPException):
+
+    def __init__(self, etag: str) -> None:
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+
+def make_etag(*parts: Hashable) -> str:
+    return '"{}"'.format(sha1(repr(parts).encode()).hexdigest())
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def check_etag(etag: str, request: Request, response: Response) -> None:
+    """Answer 304 if the client already has ``etag``, else send it."""
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        raise NotModified(etag)
+    response.headers["ETag"] = etag
@@ -1,15 +1,26 @@
 """Entry point."""
 
 from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
 
+from .admin.router import router as admin_router
+from .auth.hashing import hashing_executor
 from .auth.router import router as auth_router
 from .auth.token_service import AuthJWT
+from .cache import caches
+from .catalog.router import router as catalog_router
 from .config import Config
 from .database import Database
 from .education.router import router as education_router
-from .middlewares import DatabaseMiddleware, JWTMiddleware
+from .metrics.router import router as metrics_router
+from .middlewares import (
+    CompressionMiddleware,
+    DatabaseMiddleware,
+    JWTMiddleware,
+    MetricsMiddleware,
+    TrafficCaptureMiddleware,
+)
 from .profile.router import router as profile_router
+from .slow_queries import slow_query_log
 from .teaching.router import router as teaching_router
 
 
@@ -17,22 +28,75 @@ class Memourse:
     def __init__(self) -> None:
         config = Config(_env_file=".env")
 
-        db = Database(config.DBURL)
-        auth_jwt = AuthJWT(config.SECRETKEY, config.JWTALGORITHM)
+        self.db = Database(
+            config.DBURL,
+            pool_options={
+                "pool_size": config.DBPOOLSIZE,
+                "max_overflow": config.DBMAXOVERFLOW,
+                "pool_timeout": config.DBPOOLTIMEOUT,
+                "pool_recycle": config.DBPOOLRECYCLE,
+                "pool_pre_ping": config.DBPOOLPREPING,
+            },
+            sqlite_pragmas={
+                "journal_mode": config.SQLITEJOURNALMODE,
+                "synchronous": config.SQLITESYNCHRONOUS,
+                "busy_timeout": config.SQLITEBUSYTIMEOUT,
+                "mmap_size": config.SQLITEMMAPSIZE,
+                "cache_size": config.SQLITECACHESIZE,
+            },
+            read_db_url=config.DBREADURL,
+            read_pool_options={
+                "pool_size": config.DBREADPOOLSIZE,
+                "max_overflow": config.DBREADMAXOVERFLOW,
+                "pool_timeout": config.DBPOOLTIMEOUT,
+                "pool_recycle": config.DBPOOLRECYCLE,
+                "pool_pre_ping": config.DBPOOLPREPING,
+            },
+        )
+        self.auth_jwt = AuthJWT(
+            config.SECRETKEY, config.JWTALGORITHM, config.TOKENCACHESIZE
+        )
 
-        self.db_middleware = DatabaseMiddleware(db.session)
-        self.jwt_middlware = JWTMiddleware(auth_jwt)
+        self.compression_minimum_size = config.COMPRESSIONMINSIZE
+        self.traffic_capture_file = config.TRAFFICCAPTUREFILE
+        self.admin_ids = frozenset(config.ADMINIDS)
+
+        for cache in caches.values():
+            cache.configure(config.CACHEMAXSIZE, config.CACHETTL)
+        hashing_executor.configure(config.HASHWORKERS, config.HASHQUEUESIZE)
+        slow_query_log.configure(
+            config.SLOWQUERYTHRESHOLD,
+            config.SLOWQUERYLOGSIZE,
+            config.SLOWQUERYLOGFILE,
+        )
 
     def create_app(self) -> FastAPI:
         app = FastAPI()
+        app.state.admin_ids = self.admin_ids
 
         app.include_router(auth_router)
         app.include_router(profile_router)
+        app.include_router(catalog_router)
         app.include_router(teaching_router)
         app.include_router(education_router)
+        app.include_router(admin_router)
+        app.include_router(metrics_router)
 
-        app.add_middleware(BaseHTTPMiddleware, dispatch=self.db_middleware)
-        app.add_middleware(BaseHTTPMiddleware, dispatch=self.jwt_middlware)
+        app.add_middleware(
+            DatabaseMiddleware,
+            session_maker=self.db.session,
+            read_session_maker=self.db.read_session,
+            read_prefixes=("/catalog", "/education", "/profile"),
+        )
+        app.add_middleware(JWTMiddleware, jwt_service=self.auth_jwt)
+        app.add_middleware(
+            CompressionMiddleware, minimum_size=self.compression_minimum_size
+        )
+        if self.traffic_capture_file is not None:
+            app.add_middleware(
+                TrafficCaptureMiddleware, path=self.traffic_capture_file
+            )
+        app.add_middleware(MetricsMiddleware)
         return app
 
 
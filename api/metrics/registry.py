@@ -0,0 +1,200 @@
+"""File to in-process metrics in the Prometheus text format.
+
+Collectors keep plain counters per label values and only build text when
+``/metrics`` is scraped, so recording a sample is a dict lookup and a few
+additions.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterator
+from math import inf
+from typing import TypeVar
+
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = (
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", r"\\")
+            .replace('"', r"\"")
+            .replace("\n", r"\n"),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == inf:
+        return "+Inf"
+    return repr(value)
+
+
+class Metric(ABC):
+    type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yields ``(suffix, labels, value)`` of every series."""
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        for suffix, labels, value in self.samples():
+            yield f"{self.name}{suffix}{labels} {format_value(value)}"
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for labels, value in self.values.items():
+            yield "_total", format_labels(self.labelnames, labels), value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for labels, value in self.values.items():
+            yield "", format_labels(self.labelnames, labels), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*buckets, inf)
+        self.counts: dict[tuple[str, ...], list[int]] = {}
+        self.sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * len(self.buckets)
+            self.sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        names = (*self.labelnames, "le")
+        for labels, counts in self.counts.items():
+            total = 0
+            for bound, count in zip(self.buckets, counts):
+                total += count
+                yield "_bucket", format_labels(
+                    names, (*labels, format_value(bound))
+                ), total
+            label_text = format_labels(self.labelnames, labels)
+            yield "_sum", label_text, self.sums[labels]
+            yield "_count", label_text, total
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "".join(
+            f"{line}\n" for metric in self.metrics for line in metric.render()
+        )
+
+
+registry = Registry()
+
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template.",
+        ("method", "route", "status"),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge(
+        "http_requests_in_flight",
+        "HTTP requests being served.",
+        ("method",),
+    )
+)
+db_query_duration = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Database statement execution time.",
+        ("engine", "operation"),
+    )
+)
+db_pool_checkout_duration = registry.register(
+    Histogram(
+        "db_pool_checkout_seconds",
+        "Time spent waiting for a pooled database connection.",
+        ("engine",),
+    )
+)
+hashing_duration = registry.register(
+    Histogram(
+        "password_hashing_duration_seconds",
+        "bcrypt work time in the hashing pool.",
+        ("operation",),
+        buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+    )
+)
+hashing_queue_wait = registry.register(
+    Histogram(
+        "password_hashing_queue_wait_seconds",
+        "Time bcrypt jobs waited for a hashing pool worker.",
+        ("operation",),
+    )
+)
@@ -1,40 +1,308 @@
 """File to app middlewares."""
 
-from typing import Awaitable, Callable
+from hashlib import sha256
+from time import perf_counter, time
 
-from fastapi import Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.responses import Response
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .auth.token_service import AuthJWT
+from .cache import compressed_response_cache
+from .compression import choose_encoding, ENCODERS, is_compressible
+from .metrics.registry import http_request_duration, http_requests_in_flight
+from .slow_queries import request_scope
+from .traffic import make_trace, MAX_BODY_SIZE, TraceWriter
+
+
+class LazySession:
+    """Database session opened on first use."""
+
+    def __init__(self, session_maker: async_sessionmaker) -> None:
+        self.session_maker = session_maker
+        self._session: AsyncSession | None = None
+
+    def get(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self.session_maker()
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
 
 class DatabaseMiddleware:
-    """Middlware to transfer database session for endpoints."""
+    """Middlware to transfer database session for endpoints.
 
-    def __init__(self, session: AsyncSession) -> None:
-        self.session = session
+    The session is created only if an endpoint asks for it and is closed
+    after the response has been sent. GET and HEAD requests under
+    ``read_prefixes`` get a session of ``read_session_maker``. The scope is
+    kept in ``request_scope`` so slow queries know their route.
+    """
 
-    async def __call__(
+    def __init__(
         self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        async with self.session() as session:
-            request.state.session = session
-            return await call_next(request)
+        app: ASGIApp,
+        session_maker: async_sessionmaker,
+        read_session_maker: async_sessionmaker | None = None,
+        read_prefixes: tuple[str, ...] = (),
+    ) -> None:
+        self.app = app
+        self.session_maker = session_maker
+        self.read_session_maker = read_session_maker or session_maker
+        self.read_prefixes = read_prefixes
+
+    def choose_session_maker(self, scope: Scope) -> async_sessionmaker:
+        if scope.get("method") in ("GET", "HEAD") and scope["path"].startswith(
+            self.read_prefixes
+        ):
+            return self.read_session_maker
+        return self.session_maker
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        lazy_session = LazySession(self.choose_session_maker(scope))
+        scope.setdefault("state", {})["lazy_session"] = lazy_session
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await lazy_session.close()
+            request_scope.reset(token)
 
 
 class JWTMiddleware:
     """Middlware to transfer auth service for endpoints."""
 
-    def __init__(self, jwt_service: AuthJWT) -> None:
+    def __init__(self, app: ASGIApp, jwt_service: AuthJWT) -> None:
+        self.app = app
         self.jwt_service = jwt_service
 
     async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] in ("http", "websocket"):
+            scope.setdefault("state", {})["jwt_service"] = self.jwt_service
+        await self.app(scope, receive, send)
+
+
+class CompressionMiddleware:
+    """Middleware to compress responses with the best accepted encoding.
+
+    Bodies under ``minimum_size``, streamed bodies and routes that depend
+    on ``skip_compression`` are sent as is. Compressed bodies of responses
+    with an ETag are cached by a digest of the uncompressed body, so
+    repeated hits are not recompressed. Every response of a compressible
+    type varies on ``Accept-Encoding``, compressed or not, so shared caches
+    never hand a plain body to clients that asked for a compressed one or
+    the other way round.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 512) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        responder = CompressionResponder(
+            scope, send, encoding, self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    """Buffers one response and compresses it before it is sent."""
+
+    def __init__(
         self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        request.state.jwt_service = self.jwt_service
-        return await call_next(request)
+        scope: Scope,
+        send: Send,
+        encoding: str | None,
+        minimum_size: int,
+    ) -> None:
+        self.scope = scope
+        self.raw_send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Message | None = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if self.start_message is None or message["type"] != (
+            "http.response.body"
+        ):
+            await self.raw_send(message)
+            return
+
+        start_message, self.start_message = self.start_message, None
+        headers = MutableHeaders(raw=start_message["headers"])
+        if is_compressible(headers.get("content-type", "")):
+            headers.add_vary_header("Accept-Encoding")
+        if self.should_compress(start_message, message):
+            message = self.compress(start_message, message["body"])
+        await self.raw_send(start_message)
+        await self.raw_send(message)
+
+    def should_compress(self, start: Message, message: Message) -> bool:
+        headers = Headers(raw=start["headers"])
+        return (
+            self.encoding is not None
+            and not message.get("more_body", False)
+            and len(message["body"]) >= self.minimum_size
+            and "content-encoding" not in headers
+            and is_compressible(headers.get("content-type", ""))
+            and self.scope.get("state", {}).get("compress", True)
+        )
+
+    def compress(self, start: Message, body: bytes) -> Message:
+        headers = MutableHeaders(raw=start["headers"])
+        etag = headers.get("etag")
+
+        # Keyed by a digest of the body rather than the ETag, so a tag
+        # that outlived its content never serves another body.
+        key = None
+        compressed = None
+        if etag is not None:
+            key = (self.encoding, sha256(body).digest())
+            compressed = compressed_response_cache.get(key)
+        if compressed is None:
+            compressed = ENCODERS[self.encoding](body)
+            if key is not None:
+                compressed_response_cache.set(key, compressed)
+
+        headers["content-encoding"] = self.encoding
+        headers["content-length"] = str(len(compressed))
+        if etag is not None and not etag.startswith("W/"):
+            headers["etag"] = "W/" + etag
+        return {"type": "http.response.body", "body": compressed}
+
+
+class MetricsMiddleware:
+    """Middleware to record request latency and requests in flight.
+
+    Latency is labelled with the matched route template rather than the
+    raw path, so the number of series stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(method)
+            http_request_duration.observe(
+                perf_counter() - started,
+                method,
+                getattr(scope.get("route"), "path", "unmatched"),
+                str(status_code),
+            )
+
+
+class BodyCapture:
+    """Receive callable keeping a copy of a JSON request body."""
+
+    def __init__(self, scope: Scope, receive: Receive) -> None:
+        self.receive = receive
+        self.enabled = (
+            Headers(scope=scope)
+            .get("content-type", "")
+            .startswith("application/json")
+        )
+        self.body = bytearray()
+
+    async def __call__(self) -> Message:
+        message = await self.receive()
+        if self.enabled and len(self.body) <= MAX_BODY_SIZE:
+            self.body.extend(message.get("body", b""))
+        return message
+
+
+class TrafficCaptureMiddleware:
+    """Middleware to append a sanitized trace of every request to a file.
+
+    Traces keep the route template, path and query parameters, the JSON
+    body with its strings replaced by typed placeholders, the id of the
+    user the request acted for, the status and the duration, so
+    ``benchmarks.replay`` can reissue them. Tokens, passwords and other
+    typed text are never written. Buffered traces are written out when
+    the app shuts down.
+    """
+
+    def __init__(self, app: ASGIApp, path: str) -> None:
+        self.app = app
+        self.writer = TraceWriter(path)
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, self.close_on_shutdown(send))
+            return
+
+        receive_with_body = BodyCapture(scope, receive)
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time()
+        started = perf_counter()
+        try:
+            await self.app(scope, receive_with_body, send_with_status)
+        finally:
+            self.writer.write(
+                make_trace(
+                    scope,
+                    bytes(receive_with_body.body),
+                    status_code,
+                    started_at,
+                    perf_counter() - started,
+                )
+            )
+
+    def close_on_shutdown(self, send: Send) -> Send:
+        async def send_after_close(message: Message) -> None:
+            if message["type"] == "lifespan.shutdown.complete":
+                await self.writer.close()
+            await send(message)
+
+        return send_after_close
@@ -2,7 +2,17 @@
 
 from datetime import date, datetime
 
-from sqlalchemy import ForeignKey, JSON, String, func
+from sqlalchemy import (
+    column,
+    DDL,
+    event,
+    ForeignKey,
+    func,
+    Index,
+    JSON,
+    String,
+    table,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -40,9 +50,10 @@ class Course(Base):
     chapters_sequense: Mapped[list[int]] = mapped_column(
         JSON(), insert_default=[], server_default="[]"
     )
+    version: Mapped[int] = mapped_column(insert_default=1, server_default="1")
 
     author_id: Mapped[int] = mapped_column(
-        ForeignKey("user.id", ondelete="CASCADE")
+        ForeignKey("user.id", ondelete="CASCADE"), index=True
     )
     author: Mapped["User"] = relationship(back_populates="courses")
 
@@ -53,6 +64,13 @@ class Course(Base):
         cascade="all, delete",
     )
 
+    # Ids are never handed out again, so ``(id, version)`` tells apart a
+    # deleted course from a later one in ETags.
+    __table_args__ = (
+        Index("ix_course_date_started_id", "date_started", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
 
 class Review(Base):
     __tablename__ = "review"
@@ -61,12 +79,12 @@ class Review(Base):
     text: Mapped[str] = mapped_column(String(4096))
 
     author_id: Mapped[int] = mapped_column(
-        ForeignKey("user.id", ondelete="CASCADE")
+        ForeignKey("user.id", ondelete="CASCADE"), index=True
     )
     author: Mapped["User"] = relationship(cascade="all, delete")
 
     course_id: Mapped[int] = mapped_column(
-        ForeignKey("course.id", ondelete="CASCADE")
+        ForeignKey("course.id", ondelete="CASCADE"), index=True
     )
 
 
@@ -82,7 +100,7 @@ class Chapter(Base):
     )
 
     course_id: Mapped[int] = mapped_column(
-        ForeignKey("course.id", ondelete="CASCADE")
+        ForeignKey("course.id", ondelete="CASCADE"), index=True
     )
     course: Mapped["Course"] = relationship(back_populates="chapters")
 
@@ -98,12 +116,20 @@ class Lesson(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(50))
     content: Mapped[str] = mapped_column(String(16384))
+    version: Mapped[int] = mapped_column(insert_default=1, server_default="1")
 
     chapter_id: Mapped[int] = mapped_column(
-        ForeignKey("chapter.id", ondelete="CASCADE")
+        ForeignKey("chapter.id", ondelete="CASCADE"), index=True
     )
     chapter: Mapped["Chapter"] = relationship(back_populates="lessons")
 
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("course.id", ondelete="CASCADE"), index=True
+    )
+
+    # Ids are never handed out again, see Course.
+    __table_args__ = {"sqlite_autoincrement": True}
+
 
 class Comment(Base):
     __tablename__ = "comment"
@@ -115,11 +141,101 @@ class Comment(Base):
         ForeignKey("lesson.id", ondelete="CASCADE")
     )
 
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("course.id", ondelete="CASCADE"), index=True
+    )
+
     parent_comment_id: Mapped[int] = mapped_column(
-        ForeignKey("comment.id", ondelete="CASCADE"), nullable=True
+        ForeignKey("comment.id", ondelete="CASCADE"), nullable=True, index=True
     )
 
     author_id: Mapped[int] = mapped_column(
         ForeignKey("user.id", ondelete="CASCADE")
     )
     author: Mapped["User"] = relationship(cascade="all, delete")
+
+    # Also serves lookups by lesson_id alone, as its leading column.
+    __table_args__ = (
+        Index(
+            "ix_comment_lesson_id_parent_comment_id",
+            "lesson_id",
+            "parent_comment_id",
+        ),
+    )
+
+
+# Full-text indexes are external content FTS5 tables kept in sync with
+# their source tables by triggers, so they exist on SQLite only.
+# These statements are the authoritative definition, used by create_all.
+# Migration b7a9c3e15d42 keeps a frozen copy of them as of its revision,
+# so a change here needs a new migration rather than an edit there.
+course_fts = table("course_fts", column("rowid"))
+lesson_fts = table("lesson_fts", column("rowid"))
+
+FULL_TEXT_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS course_fts USING fts5(
+        name, description, content='course', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS course_fts_ai
+    AFTER INSERT ON course BEGIN
+        INSERT INTO course_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS course_fts_ad
+    AFTER DELETE ON course BEGIN
+        INSERT INTO course_fts(course_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS course_fts_au
+    AFTER UPDATE OF name, description ON course BEGIN
+        INSERT INTO course_fts(course_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO course_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS lesson_fts USING fts5(
+        name, content, content='lesson', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS lesson_fts_ai
+    AFTER INSERT ON lesson BEGIN
+        INSERT INTO lesson_fts(rowid, name, content)
+        VALUES (new.id, new.name, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS lesson_fts_ad
+    AFTER DELETE ON lesson BEGIN
+        INSERT INTO lesson_fts(lesson_fts, rowid, name, content)
+        VALUES ('delete', old.id, old.name, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS lesson_fts_au
+    AFTER UPDATE OF name, content ON lesson BEGIN
+        INSERT INTO lesson_fts(lesson_fts, rowid, name, content)
+        VALUES ('delete', old.id, old.name, old.content);
+        INSERT INTO lesson_fts(rowid, name, content)
+        VALUES (new.id, new.name, new.content);
+    END
+    """,
+)
+
+for statement in FULL_TEXT_SEARCH_DDL:
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from .exceptions import EmailIsTaken, UsernameIsTaken
 from .schemas import UpdateUserProfile
-from ..auth.dependencies import DatabaseSession, IsAuthenticated
+from ..auth.dependencies import get_session, is_authenticated
 from ..models import User
 
 
@@ -14,8 +14,8 @@ class UserDataIsValid:
     async def __call__(
         self,
         user_data: UpdateUserProfile,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
-        _: Annotated[Any, Depends(IsAuthenticated())],
+        session: Annotated[AsyncSession, Depends(get_session)],
+        _: Annotated[Any, Depends(is_authenticated)],
     ) -> UpdateUserProfile:
         if not await self.username_is_available(user_data.username, session):
             raise UsernameIsTaken
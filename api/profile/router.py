@@ -7,7 +7,7 @@ from .dependencies import UserDataIsValid
 from .exceptions import UserDoesNotExist
 from .schemas import PublicUserProfile, UpdateUserProfile, UserProfile
 from .service import delete_user, get_user, update_user
-from ..auth.dependencies import DatabaseSession, IsAuthenticated
+from ..auth.dependencies import get_session, is_authenticated
 
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
@@ -15,8 +15,8 @@ router = APIRouter(prefix="/profile", tags=["Profile"])
 
 @router.get("")
 async def get_user_profile(
-    payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> UserProfile:
 
     user = await get_user(session, payload["id"])
@@ -29,24 +29,24 @@ async def get_user_profile(
 @router.put("")
 async def update_user_data(
     new_user_data: Annotated[UpdateUserProfile, Depends(UserDataIsValid())],
-    payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> UserProfile:
     return await update_user(session, payload["id"], new_user_data)
 
 
 @router.delete("")
 async def delete_user_data(
-    payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Response:
     await delete_user(session, payload["id"])
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.get("/{user_id}", dependencies=[Depends(IsAuthenticated())])
+@router.get("/{user_id}", dependencies=[Depends(is_authenticated)])
 async def get_user_public_profile(
-    user_id: int, session: Annotated[AsyncSession, Depends(DatabaseSession())]
+    user_id: int, session: Annotated[AsyncSession, Depends(get_session)]
 ) -> PublicUserProfile:
 
     user = await get_user(session, user_id)
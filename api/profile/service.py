@@ -2,7 +2,13 @@ from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .schemas import UpdateUserProfile
-from ..models import User
+from ..cache import (
+    catalog_cache,
+    course_info_cache,
+    course_outline_cache,
+    enrollment_cache,
+)
+from ..models import Course, User
 
 
 async def get_user(session: AsyncSession, user_id: int) -> User:
@@ -13,6 +19,11 @@ async def delete_user(session: AsyncSession, user_id: int) -> None:
     await session.execute(delete(User).where(User.id == user_id))
     await session.commit()
 
+    catalog_cache.clear()
+    course_info_cache.clear()
+    course_outline_cache.clear()
+    enrollment_cache.invalidate(user_id)
+
 
 async def update_user(
     session: AsyncSession, user_id: int, user_data: UpdateUserProfile
@@ -24,9 +35,16 @@ async def update_user(
         .values(**user_data.model_dump(exclude_unset=True))
         .returning(User)
     )
+    if user_data.model_fields_set & {"username", "avatar"}:
+        await session.execute(
+            update(Course)
+            .where(Course.author_id == user_id)
+            .values(version=Course.version + 1)
+        )
 
     await session.commit()
 
     await session.refresh(user)
 
+    course_info_cache.clear()
     return user
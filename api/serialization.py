@@ -0,0 +1,30 @@
+"""File to serialize ORM rows straight to JSON responses."""
+
+from typing import Generic, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+T = TypeVar("T")
+
+
+class JSONSerializer(Generic[T]):
+    """Prebuilt serializer of rows into a JSON response.
+
+    Rows are validated against ``schema`` from attributes and dumped to
+    bytes by pydantic-core, skipping the round trip through Python objects
+    that FastAPI makes for a ``response_model``. Routes opt in by declaring
+    ``response_model`` for the docs and returning ``response()``.
+    """
+
+    def __init__(self, schema: type[T]) -> None:
+        self.adapter = TypeAdapter(schema)
+
+    def dump(self, content: object) -> bytes:
+        return self.adapter.dump_json(
+            self.adapter.validate_python(content, from_attributes=True)
+        )
+
+    def response(self, content: object) -> Response:
+        return Response(self.dump(content), media_type="application/json")
@@ -0,0 +1,163 @@
+"""File to record slow database statements with their query plans."""
+
+from collections import deque
+from collections.abc import Mapping
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from hashlib import sha1
+import json
+import logging
+from typing import Any
+
+from sqlalchemy.engine import Connection
+from starlette.types import Scope
+
+from .cache import LRUCache
+
+
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+logger = logging.getLogger(__name__)
+
+request_scope: ContextVar[Scope | None] = ContextVar(
+    "request_scope", default=None
+)
+
+
+def fingerprint(statement: str) -> str:
+    """Short hash of a statement, the same for any bound parameters."""
+    return sha1(" ".join(statement.split()).encode()).hexdigest()[:16]
+
+
+def parameters_shape(
+    parameters: object, executemany: bool
+) -> list[str] | dict[str, object]:
+    """Types of the bound parameters, their values are never recorded."""
+    if executemany:
+        rows = list(parameters)
+        return {
+            "rows": len(rows),
+            "row": parameters_shape(rows[0], False) if rows else [],
+        }
+    if isinstance(parameters, Mapping):
+        return {
+            name: type(value).__name__ for name, value in parameters.items()
+        }
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def current_route() -> str | None:
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = getattr(scope.get("route"), "path", "unmatched")
+    return f"{scope['method']} {route}"
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    """Tables SQLite reads whole, rather than an index, FTS match or CTE."""
+    materialized = {
+        detail.split()[1]
+        for detail in plan
+        if detail.startswith("MATERIALIZE ")
+    }
+    scanned = {
+        detail.split()[1]
+        for detail in plan
+        if detail.startswith("SCAN ")
+        and " USING " not in detail
+        and " VIRTUAL TABLE " not in detail
+        and detail != "SCAN CONSTANT ROW"
+    }
+    return sorted(scanned - materialized)
+
+
+class SlowQueryLog:
+    """Ring buffer of statements that ran for at least ``threshold`` seconds.
+
+    The first time a statement is slow on SQLite its ``EXPLAIN QUERY PLAN``
+    is captured and kept per fingerprint, so repeats cost no extra query.
+    Every entry is also logged as one JSON line.
+    """
+
+    def __init__(self, threshold: float = 0.1, maxlen: int = 100) -> None:
+        self.threshold = threshold
+        self.entries: deque[dict[str, Any]] = deque(maxlen=maxlen)
+        # Plans expire, so a new index shows up without a restart.
+        self.plans = LRUCache(maxsize=1024, ttl=3600)
+        self.recorded = 0
+        self._handler: logging.Handler | None = None
+
+    def configure(
+        self, threshold: float, maxlen: int, log_file: str | None = None
+    ) -> None:
+        self.threshold = threshold
+        self.entries = deque(maxlen=maxlen)
+        self.plans.clear()
+        if self._handler is not None:
+            logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+        if log_file is not None:
+            self._handler = logging.FileHandler(log_file)
+            self._handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(self._handler)
+
+    def explain(
+        self,
+        conn: Connection,
+        statement: str,
+        parameters: object,
+        executemany: bool,
+    ) -> list[str] | None:
+        operation = statement.lstrip().split(None, 1)[0].upper()
+        if conn.dialect.name != "sqlite" or operation not in EXPLAINABLE:
+            return None
+        if executemany:
+            parameters = next(iter(parameters), ())
+
+        # A raw DBAPI cursor, so the plan query does not reach the hooks.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        except conn.dialect.dbapi.Error as error:
+            return [f"unavailable: {error}"]
+        finally:
+            cursor.close()
+
+    def record(
+        self,
+        conn: Connection,
+        statement: str,
+        parameters: object,
+        executemany: bool,
+        elapsed: float,
+        engine_name: str,
+    ) -> None:
+        key = fingerprint(statement)
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = self.explain(conn, statement, parameters, executemany)
+            self.plans.set(key, plan)
+
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "engine": engine_name,
+            "route": current_route(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "fingerprint": key,
+            "statement": statement,
+            "parameters": parameters_shape(parameters, executemany),
+            "plan": plan,
+            "full_scans": full_scans(plan or []),
+        }
+        self.entries.append(entry)
+        self.recorded += 1
+        logger.warning(json.dumps(entry))
+
+    def recent(self) -> list[dict[str, Any]]:
+        return list(reversed(self.entries))
+
+
+slow_query_log = SlowQueryLog()
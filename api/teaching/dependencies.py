@@ -1,22 +1,35 @@
 from datetime import date
 from typing import Annotated, Any
 
-from fastapi import Depends
+from fastapi import Body, Depends
 from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .exceptions import CourseNameIsTaken, DateIsIncorrect, InsufficientRights
-from .schemas import CourseDataForVerification, CourseOnCreate, CourseOnUpdate
-from ..auth.dependencies import DatabaseSession, IsAuthenticated
+from .exceptions import (
+    CourseNameIsTaken,
+    DateIsIncorrect,
+    InsufficientRights,
+    TooManyLessons,
+)
+from .schemas import (
+    ChapterOutlineOnCreate,
+    CourseDataForVerification,
+    CourseOnCreate,
+    CourseOnUpdate,
+)
+from ..auth.dependencies import get_session, is_authenticated
 from ..models import Chapter, Course, Lesson
 
 
+MAX_BULK_LESSONS = 1000
+
+
 class CourseValidOnUpdate:
 
     async def __call__(
         self,
         course_data: CourseOnUpdate,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> CourseOnUpdate:
         return await CourseDataIsValid(session, course_data).validate()
 
@@ -26,7 +39,7 @@ class CourseValidOnCreate:
     async def __call__(
         self,
         course_data: CourseOnCreate,
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> CourseOnCreate:
         return await CourseDataIsValid(session, course_data).validate()
 
@@ -60,20 +73,37 @@ class CourseDataIsValid:
         return self.course_data.date_started < date.today()
 
 
+async def authorship_is_confirmed(
+    session: AsyncSession,
+    author_id: int,
+    course_id: int,
+    chapter_id: int | None = None,
+    lesson_id: int | None = None,
+) -> bool:
+    st = select(Course.id).where(
+        Course.id == course_id, Course.author_id == author_id
+    )
+    if chapter_id is not None:
+        st = st.join(Chapter, Chapter.course_id == Course.id).where(
+            Chapter.id == chapter_id
+        )
+    if lesson_id is not None:
+        st = st.join(Lesson, Lesson.chapter_id == Chapter.id).where(
+            Lesson.id == lesson_id
+        )
+    return await session.scalar(select(st.exists()))
+
+
 class IsCourseAuthor:
 
     async def __call__(
         self,
         course_id: int,
-        payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
-        if not await session.scalar(
-            select(
-                exists().where(
-                    Course.id == course_id, Course.author_id == payload["id"]
-                )
-            )
+        if not await authorship_is_confirmed(
+            session, payload["id"], course_id
         ):
             raise InsufficientRights
         return course_id
@@ -83,16 +113,13 @@ class IsChapterAuthor:
 
     async def __call__(
         self,
+        course_id: int,
         chapter_id: int,
-        course_id: Annotated[int, Depends(IsCourseAuthor())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
     ) -> int:
-        if not await session.scalar(
-            select(
-                exists().where(
-                    Chapter.course_id == course_id, Chapter.id == chapter_id
-                )
-            )
+        if not await authorship_is_confirmed(
+            session, payload["id"], course_id, chapter_id
         ):
             raise InsufficientRights
         return chapter_id
@@ -102,15 +129,28 @@ class IsLessonAuthor:
 
     async def __call__(
         self,
+        course_id: int,
+        chapter_id: int,
         lesson_id: int,
-        chapter_id: Annotated[int, Depends(IsChapterAuthor())],
-        session: Annotated[AsyncSession, Depends(DatabaseSession())],
-    ) -> None:
-        if not await session.scalar(
-            select(
-                exists().where(
-                    Lesson.chapter_id == chapter_id, Lesson.id == lesson_id
-                )
-            )
+        payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+        session: Annotated[AsyncSession, Depends(get_session)],
+    ) -> int:
+        if not await authorship_is_confirmed(
+            session, payload["id"], course_id, chapter_id, lesson_id
         ):
             raise InsufficientRights
+        return lesson_id
+
+
+class ChaptersOutlineIsValid:
+
+    async def __call__(
+        self,
+        chapters: Annotated[
+            list[ChapterOutlineOnCreate], Body(min_length=1, max_length=500)
+        ],
+    ) -> list[ChapterOutlineOnCreate]:
+        lessons = sum(len(chapter.lessons) for chapter in chapters)
+        if lessons > MAX_BULK_LESSONS:
+            raise TooManyLessons
+        return chapters
@@ -15,3 +15,18 @@ InsufficientRights = HTTPException(
     status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
     detail="Insufficient rights"
 )
+
+InvalidImportData = HTTPException(
+    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    detail="Invalid import data"
+)
+
+ImportLineIsTooLong = HTTPException(
+    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    detail="Import line is too long"
+)
+
+TooManyLessons = HTTPException(
+    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    detail="Too many lessons in one request"
+)
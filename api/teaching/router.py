@@ -1,19 +1,24 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Body, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .dependencies import (
+    ChaptersOutlineIsValid,
     CourseValidOnCreate,
     CourseValidOnUpdate,
     IsChapterAuthor,
     IsCourseAuthor,
     IsLessonAuthor,
+    MAX_BULK_LESSONS,
 )
 from .schemas import (
     ChapterOnAnswer,
     ChapterOnCreate,
     ChapterOnUpdate,
+    ChapterOutlineOnAnswer,
+    ChapterOutlineOnCreate,
     CourseOnAnswer,
     CourseOnCreate,
     CourseOnUpdate,
@@ -22,38 +27,72 @@ from .schemas import (
     LessonOnUpdate,
 )
 from .service import (
+    CourseImporter,
     create_chapter,
+    create_chapters,
     create_course,
     create_lesson,
+    create_lessons,
     delete_chapter,
     delete_course,
     delete_lesson,
+    export_course,
     get_chapters,
     get_course,
     get_lessons,
+    iter_lines,
     update_chapter,
     update_course,
     update_lesson,
 )
-from ..auth.dependencies import DatabaseSession, IsAuthenticated
+from ..auth.dependencies import get_session, is_authenticated
+from ..compression import skip_compression
+from ..serialization import JSONSerializer
 
 
 router = APIRouter(prefix="/teach", tags=["Teach"])
 
+chapters_serializer = JSONSerializer(list[ChapterOnAnswer])
+lessons_serializer = JSONSerializer(list[LessonOnAnswer])
+
 
 @router.post("/course")
 async def create_course_handler(
-    payload: Annotated[dict[str, Any], Depends(IsAuthenticated())],
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
     course_data: Annotated[CourseOnCreate, Depends(CourseValidOnCreate())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> CourseOnAnswer:
     return await create_course(course_data, payload["id"], session)
 
 
+@router.post("/course/import")
+async def import_course_handler(
+    request: Request,
+    payload: Annotated[dict[str, Any], Depends(is_authenticated)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> CourseOnAnswer:
+    return await CourseImporter(payload["id"], session).run(
+        iter_lines(request.stream())
+    )
+
+
+@router.get(
+    "/course/{course_id}/export",
+    dependencies=[Depends(IsCourseAuthor()), Depends(skip_compression)],
+)
+async def export_course_handler(
+    course_id: int,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_course(course_id, session), media_type="application/x-ndjson"
+    )
+
+
 @router.get("/course/{course_id}", dependencies=[Depends(IsCourseAuthor())])
 async def get_course_handler(
     course_id: int,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> CourseOnAnswer:
     return await get_course(course_id, session)
 
@@ -62,7 +101,7 @@ async def get_course_handler(
 async def change_course_handler(
     course_id: int,
     course_changes: Annotated[CourseOnUpdate, Depends(CourseValidOnUpdate())],
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> CourseOnAnswer:
     return await update_course(course_id, course_changes, session)
 
@@ -70,7 +109,7 @@ async def change_course_handler(
 @router.delete("/course/{course_id}", dependencies=[Depends(IsCourseAuthor())])
 async def delete_course_handler(
     course_id: int,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Response:
     await delete_course(course_id, session)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -82,19 +121,34 @@ async def delete_course_handler(
 async def create_chapter_handler(
     course_id: int,
     chapter_data: ChapterOnCreate,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> ChapterOnAnswer:
     return await create_chapter(course_id, chapter_data, session)
 
 
-@router.get(
+@router.post(
     "/course/{course_id}/chapters", dependencies=[Depends(IsCourseAuthor())]
 )
+async def create_chapters_handler(
+    course_id: int,
+    chapters: Annotated[
+        list[ChapterOutlineOnCreate], Depends(ChaptersOutlineIsValid())
+    ],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> list[ChapterOutlineOnAnswer]:
+    return await create_chapters(course_id, chapters, session)
+
+
+@router.get(
+    "/course/{course_id}/chapters",
+    dependencies=[Depends(IsCourseAuthor())],
+    response_model=list[ChapterOnAnswer],
+)
 async def get_chapters_handler(
     course_id: int,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
-) -> list[ChapterOnAnswer]:
-    return await get_chapters(course_id, session)
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Response:
+    return chapters_serializer.response(await get_chapters(course_id, session))
 
 
 @router.put(
@@ -104,7 +158,7 @@ async def get_chapters_handler(
 async def update_chapter_handler(
     chapter_id: int,
     chapter_changes: ChapterOnUpdate,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> ChapterOnAnswer:
     return await update_chapter(chapter_id, chapter_changes, session)
 
@@ -115,7 +169,7 @@ async def update_chapter_handler(
 )
 async def delete_chapter_handler(
     chapter_id: int,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Response:
     await delete_chapter(chapter_id, session)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -126,22 +180,39 @@ async def delete_chapter_handler(
     dependencies=[Depends(IsChapterAuthor())],
 )
 async def create_lesson_handler(
+    course_id: int,
     chapter_id: int,
     lesson: LessonOnCreate,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> LessonOnAnswer:
-    return await create_lesson(chapter_id, lesson, session)
+    return await create_lesson(course_id, chapter_id, lesson, session)
+
+
+@router.post(
+    "/course/{course_id}/chapter/{chapter_id}/lessons",
+    dependencies=[Depends(IsChapterAuthor())],
+)
+async def create_lessons_handler(
+    course_id: int,
+    chapter_id: int,
+    lessons: Annotated[
+        list[LessonOnCreate], Body(min_length=1, max_length=MAX_BULK_LESSONS)
+    ],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> list[int]:
+    return await create_lessons(course_id, chapter_id, lessons, session)
 
 
 @router.get(
     "/course/{course_id}/chapter/{chapter_id}/lessons",
     dependencies=[Depends(IsChapterAuthor())],
+    response_model=list[LessonOnAnswer],
 )
 async def get_lessons_handler(
     chapter_id: int,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
-) -> list[LessonOnAnswer]:
-    return await get_lessons(chapter_id, session)
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Response:
+    return lessons_serializer.response(await get_lessons(chapter_id, session))
 
 
 @router.put(
@@ -151,7 +222,7 @@ async def get_lessons_handler(
 async def update_lesson_handler(
     lesson_id: int,
     lesson_changes: LessonOnUpdate,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> LessonOnAnswer:
     return await update_lesson(lesson_id, lesson_changes, session)
 
@@ -162,7 +233,7 @@ async def update_lesson_handler(
 )
 async def delete_lesson_handler(
     lesson_id: int,
-    session: Annotated[AsyncSession, Depends(DatabaseSession())],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Response:
     await delete_lesson(lesson_id, session)
 
@@ -1,6 +1,7 @@
 from datetime import date
+from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class BaseCourse(BaseModel):
@@ -62,3 +63,33 @@ class LessonOnUpdate(BaseModel):
 
 class LessonOnAnswer(LessonOnCreate):
     id: int
+
+
+class ChapterOutlineOnCreate(ChapterOnCreate):
+    lessons: list[LessonOnCreate] = Field(max_length=1000, default=[])
+
+
+class ChapterOutlineOnAnswer(BaseModel):
+    id: int
+    lesson_ids: list[int]
+
+
+class CourseExport(CourseOnAnswer):
+    type: Literal["course"] = "course"
+
+
+class ChapterExport(ChapterOnAnswer):
+    type: Literal["chapter"] = "chapter"
+
+
+class LessonExport(LessonOnAnswer):
+    type: Literal["lesson"] = "lesson"
+    chapter_id: int
+
+
+ExportLine = TypeAdapter(
+    Annotated[
+        CourseExport | ChapterExport | LessonExport,
+        Field(discriminator="type"),
+    ]
+)
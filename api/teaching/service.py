@@ -1,17 +1,49 @@
-from sqlalchemy import delete, select, update
+from collections.abc import AsyncIterator
+from itertools import islice
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, Update, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .dependencies import CourseDataIsValid
+from .exceptions import ImportLineIsTooLong, InvalidImportData
 from .schemas import (
+    ChapterExport,
     ChapterOnCreate,
     ChapterOnUpdate,
+    ChapterOutlineOnAnswer,
+    ChapterOutlineOnCreate,
+    CourseExport,
     CourseOnCreate,
     CourseOnUpdate,
+    ExportLine,
+    LessonExport,
     LessonOnCreate,
     LessonOnUpdate,
 )
+from ..cache import (
+    catalog_cache,
+    course_id_cache,
+    course_info_cache,
+    course_outline_cache,
+    enrollment_cache,
+)
 from ..models import Chapter, Course, Lesson
 
 
+def invalidate_course_caches(course_id: int) -> None:
+    course_info_cache.invalidate(course_id)
+    course_outline_cache.invalidate(course_id)
+
+
+def bump_course_version(course_id: int) -> Update:
+    return (
+        update(Course)
+        .where(Course.id == course_id)
+        .values(version=Course.version + 1)
+    )
+
+
 async def create_course(
     course_data: CourseOnCreate, author_id: int, session: AsyncSession
 ) -> Course:
@@ -21,6 +53,8 @@ async def create_course(
     session.add(course)
     await session.commit()
     await session.refresh(course)
+
+    catalog_cache.clear()
     return course
 
 
@@ -34,13 +68,18 @@ async def update_course(
     course = await session.scalar(
         update(Course)
         .where(Course.id == course_id)
-        .values(**course_data.model_dump(exclude_unset=True))
+        .values(
+            **course_data.model_dump(exclude_unset=True),
+            version=Course.version + 1,
+        )
         .returning(Course)
     )
 
     await session.commit()
     await session.refresh(course)
 
+    catalog_cache.clear()
+    invalidate_course_caches(course_id)
     return course
 
 
@@ -48,6 +87,12 @@ async def delete_course(course_id: int, session: AsyncSession) -> None:
     await session.execute(delete(Course).where(Course.id == course_id))
     await session.commit()
 
+    catalog_cache.clear()
+    invalidate_course_caches(course_id)
+    # Enrollments and chapters of the course went with it by cascade.
+    enrollment_cache.clear()
+    course_id_cache.clear()
+
 
 async def create_chapter(
     course_id: int, chapter_data: ChapterOnCreate, session: AsyncSession
@@ -56,13 +101,109 @@ async def create_chapter(
         **chapter_data.model_dump(exclude_unset=True), course_id=course_id
     )
     session.add(chapter)
+    await session.execute(bump_course_version(course_id))
 
     await session.commit()
     await session.refresh(chapter)
 
+    invalidate_course_caches(course_id)
     return chapter
 
 
+async def insert_rows(
+    model: type[Chapter] | type[Lesson],
+    course_id: int,
+    rows: list[dict],
+    session: AsyncSession,
+) -> list[int]:
+    """Inserts rows of one course with a single executemany.
+
+    SQLite cannot sort the RETURNING rows of a batched INSERT, so asking
+    for ids in parameter order would send one INSERT per row. Ids only
+    grow within the write transaction instead, so the newest rows of the
+    course are the inserted ones and their ids are read back in order.
+    """
+    if not rows:
+        return []
+    await session.execute(insert(model), rows)
+    new_ids = await session.scalars(
+        select(model.id)
+        .where(model.course_id == course_id)
+        .order_by(model.id.desc())
+        .limit(len(rows))
+    )
+    return list(reversed(list(new_ids)))
+
+
+async def create_chapters(
+    course_id: int,
+    chapters: list[ChapterOutlineOnCreate],
+    session: AsyncSession,
+) -> list[ChapterOutlineOnAnswer]:
+    chapter_ids = await insert_rows(
+        Chapter,
+        course_id,
+        [
+            {
+                **chapter.model_dump(exclude={"lessons"}),
+                "course_id": course_id,
+            }
+            for chapter in chapters
+        ],
+        session,
+    )
+
+    lesson_ids = await insert_rows(
+        Lesson,
+        course_id,
+        [
+            {
+                **lesson.model_dump(),
+                "chapter_id": chapter_id,
+                "course_id": course_id,
+            }
+            for chapter_id, chapter in zip(chapter_ids, chapters)
+            for lesson in chapter.lessons
+        ],
+        session,
+    )
+
+    remaining_ids = iter(lesson_ids)
+    outline = [
+        ChapterOutlineOnAnswer(
+            id=chapter_id,
+            lesson_ids=list(islice(remaining_ids, len(chapter.lessons))),
+        )
+        for chapter_id, chapter in zip(chapter_ids, chapters)
+    ]
+
+    if any(chapter.lesson_ids for chapter in outline):
+        await session.execute(
+            update(Chapter),
+            [
+                {"id": chapter.id, "lessons_sequence": chapter.lesson_ids}
+                for chapter in outline
+                if chapter.lesson_ids
+            ],
+        )
+
+    chapters_sequense = await session.scalar(
+        select(Course.chapters_sequense).where(Course.id == course_id)
+    )
+    await session.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(
+            chapters_sequense=chapters_sequense + chapter_ids,
+            version=Course.version + 1,
+        )
+    )
+    await session.commit()
+
+    invalidate_course_caches(course_id)
+    return outline
+
+
 async def get_chapters(course_id: int, session: AsyncSession) -> list[Chapter]:
     return await session.scalars(
         select(Chapter).where(Chapter.course_id == course_id)
@@ -78,31 +219,83 @@ async def update_chapter(
         .values(**chapter_changes.model_dump(exclude_unset=True))
         .returning(Chapter)
     )
+    await session.execute(bump_course_version(chapter.course_id))
 
     await session.commit()
 
     await session.refresh(chapter)
+
+    invalidate_course_caches(chapter.course_id)
     return chapter
 
 
 async def delete_chapter(chapter_id: int, session: AsyncSession) -> None:
-    await session.execute(delete(Chapter).where(Chapter.id == chapter_id))
+    course_id = await session.scalar(
+        delete(Chapter)
+        .where(Chapter.id == chapter_id)
+        .returning(Chapter.course_id)
+    )
+    await session.execute(bump_course_version(course_id))
     await session.commit()
 
+    invalidate_course_caches(course_id)
+    # Its lessons went with it, and chapter ids may be handed out again.
+    course_id_cache.clear()
+
 
 async def create_lesson(
-    chapter_id: int, lesson: LessonOnCreate, session: AsyncSession
+    course_id: int,
+    chapter_id: int,
+    lesson: LessonOnCreate,
+    session: AsyncSession,
 ) -> Lesson:
     lesson = Lesson(
-        **lesson.model_dump(exclude_unset=True), chapter_id=chapter_id
+        **lesson.model_dump(exclude_unset=True),
+        chapter_id=chapter_id,
+        course_id=course_id,
     )
     session.add(lesson)
     await session.commit()
     await session.refresh(lesson)
 
+    invalidate_course_caches(course_id)
     return lesson
 
 
+async def create_lessons(
+    course_id: int,
+    chapter_id: int,
+    lessons: list[LessonOnCreate],
+    session: AsyncSession,
+) -> list[int]:
+    lesson_ids = await insert_rows(
+        Lesson,
+        course_id,
+        [
+            {
+                **lesson.model_dump(),
+                "chapter_id": chapter_id,
+                "course_id": course_id,
+            }
+            for lesson in lessons
+        ],
+        session,
+    )
+
+    lessons_sequence = await session.scalar(
+        select(Chapter.lessons_sequence).where(Chapter.id == chapter_id)
+    )
+    await session.execute(
+        update(Chapter)
+        .where(Chapter.id == chapter_id)
+        .values(lessons_sequence=lessons_sequence + lesson_ids)
+    )
+    await session.commit()
+
+    invalidate_course_caches(course_id)
+    return lesson_ids
+
+
 async def get_lessons(chapter_id: int, session: AsyncSession) -> list[Lesson]:
     return await session.scalars(
         select(Lesson).where(Lesson.chapter_id == chapter_id)
@@ -115,16 +308,246 @@ async def update_lesson(
     lesson = await session.scalar(
         update(Lesson)
         .where(Lesson.id == lesson_id)
-        .values(**lesson_changes.model_dump(exclude_unset=True))
+        .values(
+            **lesson_changes.model_dump(exclude_unset=True),
+            version=Lesson.version + 1,
+        )
         .returning(Lesson)
     )
 
     await session.commit()
     await session.refresh(lesson)
 
+    invalidate_course_caches(lesson.course_id)
     return lesson
 
 
 async def delete_lesson(lesson_id: int, session: AsyncSession) -> None:
-    await session.execute(delete(Lesson).where(Lesson.id == lesson_id))
+    course_id = await session.scalar(
+        delete(Lesson)
+        .where(Lesson.id == lesson_id)
+        .returning(Lesson.course_id)
+    )
     await session.commit()
+
+    invalidate_course_caches(course_id)
+    course_id_cache.invalidate((Lesson.__tablename__, lesson_id))
+
+
+EXPORT_BATCH_SIZE = 500
+MAX_IMPORT_LINE_SIZE = 1024 * 1024
+
+
+async def export_course(
+    course_id: int, session: AsyncSession
+) -> AsyncIterator[str]:
+    course = await session.scalar(select(Course).where(Course.id == course_id))
+    yield CourseExport.model_validate(
+        course, from_attributes=True
+    ).model_dump_json() + "\n"
+
+    for schema, st in (
+        (
+            ChapterExport,
+            select(
+                Chapter.id,
+                Chapter.name,
+                Chapter.description,
+                Chapter.avatar,
+                Chapter.lessons_sequence,
+            )
+            .where(Chapter.course_id == course_id)
+            .order_by(Chapter.id),
+        ),
+        (
+            LessonExport,
+            select(Lesson.id, Lesson.chapter_id, Lesson.name, Lesson.content)
+            .where(Lesson.course_id == course_id)
+            .order_by(Lesson.id),
+        ),
+    ):
+        result = await session.stream(
+            st.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield "".join(
+                schema.model_validate(row._asdict()).model_dump_json() + "\n"
+                for row in rows
+            )
+
+
+def split_lines(data: bytes) -> tuple[list[bytes], bytes]:
+    """Complete lines and the unfinished tail, none over the size limit."""
+    *lines, tail = data.split(b"\n")
+    if any(len(line) > MAX_IMPORT_LINE_SIZE for line in (*lines, tail)):
+        raise ImportLineIsTooLong
+    return lines, tail
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    tail = b""
+    async for chunk in chunks:
+        lines, tail = split_lines(tail + chunk)
+        for line in lines:
+            if line.strip():
+                yield line
+    if tail.strip():
+        yield tail
+
+
+class CourseImporter:
+    """Recreates an exported course from NDJSON lines in batches.
+
+    Ids in the stream are the ones of the exported course, so chapters and
+    lessons are inserted with new ids and the sequences are remapped once
+    the whole stream has been read.
+    """
+
+    def __init__(self, author_id: int, session: AsyncSession) -> None:
+        self.author_id = author_id
+        self.session = session
+
+        self.course: CourseExport | None = None
+        self.course_id: int | None = None
+        self.chapter_ids: dict[int, int] = {}
+        self.lesson_ids: dict[int, int] = {}
+        self.lessons_sequences: dict[int, list[int]] = {}
+
+        self.chapters: list[ChapterExport] = []
+        self.lessons: list[LessonExport] = []
+
+    async def run(self, lines: AsyncIterator[bytes]) -> Course:
+        async for line in lines:
+            try:
+                item = ExportLine.validate_json(line)
+            except ValidationError:
+                raise InvalidImportData
+            await self.add(item)
+
+        if self.course_id is None:
+            raise InvalidImportData
+        await self.flush_chapters()
+        await self.flush_lessons()
+        return await self.finish()
+
+    async def add(
+        self, item: CourseExport | ChapterExport | LessonExport
+    ) -> None:
+        if isinstance(item, CourseExport):
+            await self.create_course(item)
+        elif isinstance(item, ChapterExport):
+            await self.add_chapter(item)
+        else:
+            await self.add_lesson(item)
+
+    async def add_chapter(self, chapter: ChapterExport) -> None:
+        if self.course_id is None:
+            raise InvalidImportData
+        self.chapters.append(chapter)
+        if len(self.chapters) >= EXPORT_BATCH_SIZE:
+            await self.flush_chapters()
+
+    async def add_lesson(self, lesson: LessonExport) -> None:
+        if self.course_id is None:
+            raise InvalidImportData
+        self.lessons.append(lesson)
+        if len(self.lessons) >= EXPORT_BATCH_SIZE:
+            await self.flush_lessons()
+
+    async def create_course(self, course: CourseExport) -> None:
+        if self.course_id is not None:
+            raise InvalidImportData
+        await CourseDataIsValid(self.session, course).validate()
+
+        self.course = course
+        self.course_id = await self.session.scalar(
+            insert(Course)
+            .values(
+                **course.model_dump(
+                    exclude={"id", "type", "chapters_sequense"}
+                ),
+                author_id=self.author_id,
+            )
+            .returning(Course.id)
+        )
+
+    async def flush_chapters(self) -> None:
+        if not self.chapters:
+            return
+        new_ids = await insert_rows(
+            Chapter,
+            self.course_id,
+            [
+                {
+                    **chapter.model_dump(
+                        exclude={"id", "type", "lessons_sequence"}
+                    ),
+                    "course_id": self.course_id,
+                }
+                for chapter in self.chapters
+            ],
+            self.session,
+        )
+        for chapter, new_id in zip(self.chapters, new_ids):
+            self.chapter_ids[chapter.id] = new_id
+            self.lessons_sequences[new_id] = chapter.lessons_sequence
+        self.chapters = []
+
+    async def flush_lessons(self) -> None:
+        await self.flush_chapters()
+        if not self.lessons:
+            return
+        if any(
+            lesson.chapter_id not in self.chapter_ids
+            for lesson in self.lessons
+        ):
+            raise InvalidImportData
+
+        new_ids = await insert_rows(
+            Lesson,
+            self.course_id,
+            [
+                {
+                    **lesson.model_dump(exclude={"id", "type"}),
+                    "chapter_id": self.chapter_ids[lesson.chapter_id],
+                    "course_id": self.course_id,
+                }
+                for lesson in self.lessons
+            ],
+            self.session,
+        )
+        for lesson, new_id in zip(self.lessons, new_ids):
+            self.lesson_ids[lesson.id] = new_id
+        self.lessons = []
+
+    async def finish(self) -> Course:
+        if self.lessons_sequences:
+            await self.session.execute(
+                update(Chapter),
+                [
+                    {
+                        "id": chapter_id,
+                        "lessons_sequence": remap(sequence, self.lesson_ids),
+                    }
+                    for chapter_id, sequence in self.lessons_sequences.items()
+                ],
+            )
+        course = await self.session.scalar(
+            update(Course)
+            .where(Course.id == self.course_id)
+            .values(
+                chapters_sequense=remap(
+                    self.course.chapters_sequense, self.chapter_ids
+                )
+            )
+            .returning(Course)
+        )
+        await self.session.commit()
+        await self.session.refresh(course)
+
+        catalog_cache.clear()
+        return course
+
+
+def remap(sequence: list[int], ids: dict[int, int]) -> list[int]:
+    return [ids[old_id] for old_id in sequence if old_id in ids]
@@ -0,0 +1,198 @@
+"""File to capture sanitized request traces for replay."""
+
+import asyncio
+from datetime import datetime
+import json
+import re
+from typing import Any, TextIO
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+from .auth.token_service import TokenVerification
+
+
+# Query parameters that never carry text typed by users.
+SAFE_QUERY_PARAMS = frozenset(
+    {
+        "cursor",
+        "depth",
+        "language",
+        "limit",
+        "scope",
+        "started_after",
+        "started_before",
+    }
+)
+# Body fields holding codes rather than text typed by users.
+SAFE_BODY_KEYS = frozenset({"language"})
+TOKEN_KEYS = frozenset({"access", "refresh"})
+MAX_BODY_SIZE = 65536
+
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def is_iso_date(value: str) -> bool:
+    if not ISO_DATE.match(value):
+        return False
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def placeholder(key: str, value: str) -> str:
+    """Typed stand-in for the string ``value`` of the field ``key``.
+
+    ``benchmarks.replay`` expands placeholders into values the API
+    accepts. Passwords get a fixed one, so not even their length is kept.
+    """
+    if key.startswith("password"):
+        return "<password>"
+    if key in TOKEN_KEYS:
+        return "<token>"
+    if key in ("username", "email"):
+        return f"<{key}>"
+    if is_iso_date(value):
+        return "<date>"
+    return f"<text:{len(value)}>"
+
+
+def mask(value: object, key: str = "") -> object:
+    """Replace strings with typed placeholders, keeping the structure.
+
+    Numbers, booleans and nulls are kept, since they are mostly ids that
+    decide which rows a request touches. Items of a list are masked as
+    values of the field holding the list.
+    """
+    if isinstance(value, str):
+        return value if key in SAFE_BODY_KEYS else placeholder(key, value)
+    if isinstance(value, dict):
+        return {name: mask(item, name) for name, item in value.items()}
+    if isinstance(value, list):
+        return [mask(item, key) for item in value]
+    return value
+
+
+def sanitize_query_param(name: str, value: str) -> str:
+    if name in SAFE_QUERY_PARAMS or value.isdigit():
+        return value
+    if name == "q":
+        # Only the number of terms matters for the search plan.
+        return f"<search:{len(value.split())}>"
+    return placeholder(name, value)
+
+
+def sanitize_query(query_string: bytes) -> dict[str, str]:
+    return {
+        name: sanitize_query_param(name, value)
+        for name, value in parse_qsl(query_string.decode("latin-1"))
+    }
+
+
+def sanitize_body(body: bytes) -> object:
+    if not body or len(body) > MAX_BODY_SIZE:
+        return None
+    try:
+        return mask(json.loads(body))
+    except ValueError:
+        return None
+
+
+def auth_subject(scope: Scope) -> int | None:
+    """Id of the user whose credentials or token authorized the request.
+
+    Logins and refreshes leave it in ``subject`` of the request state,
+    other requests carry it in their access token.
+    """
+    state = scope.get("state", {})
+    if state.get("subject") is not None:
+        return state["subject"]
+    jwt_service = state.get("jwt_service")
+    scheme, _, token = (
+        Headers(scope=scope).get("authorization", "").partition(" ")
+    )
+    if jwt_service is None or scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = TokenVerification("access", jwt_service).validate_token(
+            token
+        )
+    except HTTPException:
+        return None
+    return payload.get("id")
+
+
+def make_trace(
+    scope: Scope,
+    body: bytes,
+    status_code: int,
+    started_at: float,
+    elapsed: float,
+) -> dict[str, Any]:
+    return {
+        "ts": round(started_at, 6),
+        "method": scope["method"],
+        "route": getattr(scope.get("route"), "path", None),
+        "params": scope.get("path_params", {}),
+        "query": sanitize_query(scope.get("query_string", b"")),
+        "body": sanitize_body(body),
+        "user": auth_subject(scope),
+        "status": status_code,
+        "ms": round(elapsed * 1000, 3),
+    }
+
+
+class TraceWriter:
+    """Append-only file of traces, one compact JSON object per line.
+
+    Requests only add their trace to a buffer in memory. A task started
+    with the first trace hands the buffer to a worker thread every
+    ``interval`` seconds, so the event loop never waits on the file.
+    ``close`` writes what is left and closes the file.
+    """
+
+    def __init__(self, path: str, interval: float = 1.0) -> None:
+        self.path = path
+        self.interval = interval
+        self.lines: list[str] = []
+        self.closing = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+    def write(self, trace: dict[str, Any]) -> None:
+        self.lines.append(json.dumps(trace, separators=(",", ":")) + "\n")
+        if self.task is None:
+            self.closing = asyncio.Event()
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        file = await asyncio.to_thread(open, self.path, "a", encoding="utf-8")
+        try:
+            while not self.closing.is_set():
+                try:
+                    await asyncio.wait_for(self.closing.wait(), self.interval)
+                except TimeoutError:
+                    pass
+                await self.flush(file)
+        finally:
+            await asyncio.to_thread(file.close)
+
+    async def flush(self, file: TextIO) -> None:
+        lines, self.lines = self.lines, []
+        if lines:
+            await asyncio.to_thread(append, file, lines)
+
+    async def close(self) -> None:
+        if self.task is None:
+            return
+        task, self.task = self.task, None
+        self.closing.set()
+        await task
+
+
+def append(file: TextIO, lines: list[str]) -> None:
+    file.writelines(lines)
+    file.flush()
@@ -0,0 +1,74 @@
+"""Helpers to drive an ASGI app in process without a network client."""
+
+import asyncio
+import json
+from typing import Any
+
+from starlette.types import ASGIApp, Message
+
+
+def encode_body(body: object, raw_headers: list[tuple[bytes, bytes]]) -> bytes:
+    """Send ``body`` as JSON unless it is already ``bytes``."""
+    if isinstance(body, bytes):
+        return body
+    if body is None:
+        return b""
+    raw_headers.append((b"content-type", b"application/json"))
+    return json.dumps(body).encode()
+
+
+async def call(
+    app: ASGIApp,
+    method: str,
+    path: str,
+    headers: dict[str, str] | None = None,
+    body: Any = None,
+) -> tuple[int, bytes]:
+    """Send one HTTP request to ``app`` and return status and body."""
+    path, _, query = path.partition("?")
+    raw_headers = [(b"host", b"bench")]
+    payload = encode_body(body, raw_headers)
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), value.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    sent = False
+    finished = asyncio.Event()
+    status = 500
+    chunks = []
+
+    async def receive() -> Message:
+        nonlocal sent
+        if sent:
+            # Like a real client, only go away once the response is read,
+            # streaming responses listen for the disconnect meanwhile.
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    finished.set()
+    return status, b"".join(chunks)
@@ -0,0 +1,138 @@
+"""Benchmark full-text search latency of ``/catalog/search``.
+
+Seeds a temporary SQLite database with synthetic courses and lessons
+(one million lessons by default), then measures the search service for
+common, rare and prefix queries over both scopes.
+
+Usage::
+
+    python -m benchmarks.catalog_search --lessons 1000000 --queries 200
+"""
+
+import argparse
+import asyncio
+from itertools import accumulate
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from api.catalog.service import search
+from api.database import Base
+
+# Word frequencies follow Zipf's law like natural text: the word of rank
+# n appears about 1/n as often as the most common one.
+VOCABULARY = [f"w{rank}" for rank in range(1, 50001)]
+CUM_WEIGHTS = list(accumulate(1 / rank for rank in range(1, 50001)))
+QUERIES = (
+    ("common", "w10"),
+    ("medium", "w1000"),
+    ("rare", "w40000"),
+    ("phrase", "w2 w3"),
+    ("prefix", "w123"),
+)
+LESSONS_PER_COURSE = 100
+BATCH = 10000
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words))
+
+
+def seed(path: str, lessons: int) -> None:
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+
+    rng = random.Random(0)
+    courses = max(1, lessons // LESSONS_PER_COURSE)
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "INSERT INTO user (id, username, email, first_login, password) "
+            "VALUES (1, 'author', 'a@example.com', CURRENT_TIMESTAMP, '-')"
+        )
+        conn.executemany(
+            "INSERT INTO course (id, name, description, date_started, "
+            "language, author_id) VALUES (?, ?, ?, '2030-01-01', 'en', 1)",
+            (
+                (i, f"{text(rng, 3)} {i}", text(rng, 40))
+                for i in range(1, courses + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO chapter (id, name, course_id) VALUES (?, ?, ?)",
+            ((i, text(rng, 3), i) for i in range(1, courses + 1)),
+        )
+        for start in range(0, lessons, BATCH):
+            conn.executemany(
+                "INSERT INTO lesson (name, content, chapter_id, course_id) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (text(rng, 4), text(rng, 80), course, course)
+                    for course in (
+                        i // LESSONS_PER_COURSE + 1
+                        for i in range(start, min(start + BATCH, lessons))
+                    )
+                ),
+            )
+            conn.commit()
+
+
+async def measure(path: str, queries: int, enrolled: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_maker = async_sessionmaker(bind=engine)
+    course_ids = set(range(1, enrolled + 1))
+
+    async with session_maker() as session:
+        for scope in ("courses", "lessons"):
+            for kind, query in QUERIES:
+                samples = []
+                for _ in range(queries):
+                    started = time.perf_counter()
+                    await search(
+                        session,
+                        query,
+                        scope,
+                        20,
+                        course_ids=course_ids if scope == "lessons" else None,
+                    )
+                    samples.append((time.perf_counter() - started) * 1e3)
+                samples.sort()
+                p95 = samples[int(len(samples) * 0.95) - 1]
+                print(
+                    f"{scope:<8} {kind:<7} {query!r:<10} "
+                    f"p50 {statistics.median(samples):8.2f} ms  "
+                    f"p95 {p95:8.2f} ms"
+                )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument(
+        "--enrolled",
+        type=int,
+        default=50,
+        help="number of courses the searching user is enrolled in",
+    )
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "search.db")
+    started = time.perf_counter()
+    seed(path, args.lessons)
+    print(
+        f"seeded {args.lessons} lessons in "
+        f"{time.perf_counter() - started:.1f} s ({path})"
+    )
+    asyncio.run(measure(path, args.queries, args.enrolled))
+
+
+if __name__ == "__main__":
+    main()
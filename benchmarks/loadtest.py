@@ -0,0 +1,724 @@
+"""Load test the whole app with a mixed workload on synthetic data.
+
+``seed`` fills a SQLite database with users, courses, chapters, lessons,
+enrollments, reviews and comment threads through bulk inserts. ``run``
+logs virtual users in and has them browse the catalog, read lessons,
+comment and edit their own courses, either through the app in process or
+through a local uvicorn. Every user logs in before the clock starts and
+those logins are reported apart as the warm-up. It prints throughput,
+latency percentiles and errors per route as JSON, so runs can be compared.
+
+Usage::
+
+    python -m benchmarks.loadtest seed load.db --users 1000 --courses 100
+    python -m benchmarks.loadtest run load.db --concurrency 16 --duration 30
+    python -m benchmarks.loadtest run load.db --uvicorn --output run.json
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+import json
+from math import ceil
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable, NamedTuple
+from urllib.parse import quote
+
+import h11
+from sqlalchemy import create_engine
+
+from api.auth.service import pwd
+from api.database import Base
+
+from .asgi import call, encode_body
+from .catalog_search import text
+
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("JWTALGORITHM", "HS256")
+
+PASSWORD = "password"
+BATCH = 10000
+
+
+def insert(
+    conn: sqlite3.Connection, table: str, columns: str, rows: object
+) -> None:
+    placeholders = ", ".join("?" * len(columns.split(", ")))
+    conn.executemany(
+        f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows
+    )
+
+
+def seed_courses(
+    conn: sqlite3.Connection, args: argparse.Namespace, rng: random.Random
+) -> None:
+    """Course ``c`` has chapters and lessons with consecutive ids."""
+    authors = max(1, args.users // 10)
+    chapters = args.chapters
+    lessons = args.lessons
+    insert(
+        conn,
+        "course",
+        "id, name, description, date_started, language, author_id, "
+        "chapters_sequense",
+        (
+            (
+                course,
+                f"{text(rng, 3)} {course}",
+                text(rng, 40),
+                f"20{rng.randint(24, 30)}-0{rng.randint(1, 9)}-1{course % 10}",
+                rng.choice(("en", "ru", "de")),
+                (course - 1) % authors + 1,
+                json.dumps(
+                    list(
+                        range(
+                            (course - 1) * chapters + 1, course * chapters + 1
+                        )
+                    )
+                ),
+            )
+            for course in range(1, args.courses + 1)
+        ),
+    )
+    insert(
+        conn,
+        "chapter",
+        "id, name, course_id, lessons_sequence",
+        (
+            (
+                chapter,
+                text(rng, 3),
+                (chapter - 1) // chapters + 1,
+                json.dumps(
+                    list(
+                        range(
+                            (chapter - 1) * lessons + 1, chapter * lessons + 1
+                        )
+                    )
+                ),
+            )
+            for chapter in range(1, args.courses * chapters + 1)
+        ),
+    )
+    total = args.courses * chapters * lessons
+    for start in range(1, total + 1, BATCH):
+        insert(
+            conn,
+            "lesson",
+            "id, name, content, chapter_id, course_id",
+            (
+                (
+                    lesson,
+                    text(rng, 4),
+                    text(rng, 200),
+                    (lesson - 1) // lessons + 1,
+                    (lesson - 1) // (lessons * chapters) + 1,
+                )
+                for lesson in range(start, min(start + BATCH, total + 1))
+            ),
+        )
+
+
+def seed_activity(
+    conn: sqlite3.Connection, args: argparse.Namespace, rng: random.Random
+) -> None:
+    courses = range(1, args.courses + 1)
+    insert(
+        conn,
+        "user_course",
+        "user_id, course_id",
+        (
+            (user, course)
+            for user in range(1, args.users + 1)
+            for course in rng.sample(
+                courses, min(args.enrollments, len(courses))
+            )
+        ),
+    )
+    insert(
+        conn,
+        "review",
+        "text, author_id, course_id",
+        (
+            (text(rng, 30), rng.randint(1, args.users), course)
+            for course in courses
+            for _ in range(args.reviews)
+        ),
+    )
+    lessons = args.courses * args.chapters * args.lessons
+    insert(
+        conn,
+        "comment",
+        "id, text, lesson_id, course_id, parent_comment_id, author_id",
+        comment_rows(args, rng, lessons),
+    )
+
+
+def comment_rows(
+    args: argparse.Namespace, rng: random.Random, lessons: int
+) -> object:
+    """Comment threads where each reply answers a random earlier comment."""
+    per_course = args.chapters * args.lessons
+    thread_size = args.replies + 1
+    for thread in range(lessons * args.comments):
+        lesson = thread // args.comments + 1
+        first = thread * thread_size + 1
+        for comment in range(first, first + thread_size):
+            yield (
+                comment,
+                text(rng, 15),
+                lesson,
+                (lesson - 1) // per_course + 1,
+                rng.randrange(first, comment) if comment > first else None,
+                rng.randint(1, args.users),
+            )
+
+
+def seed(args: argparse.Namespace) -> dict[str, int]:
+    if os.path.exists(args.db):
+        sys.exit(f"{args.db} already exists")
+    Base.metadata.create_all(create_engine(f"sqlite:///{args.db}"))
+
+    rng = random.Random(args.seed)
+    # Everyone shares one bcrypt hash, hashing each would take minutes.
+    password = pwd.hash(PASSWORD)
+    with sqlite3.connect(args.db) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        insert(
+            conn,
+            "user",
+            "id, username, email, first_login, password",
+            (
+                (
+                    user,
+                    f"user{user}",
+                    f"user{user}@example.com",
+                    "2030-01-01 00:00:00",
+                    password,
+                )
+                for user in range(1, args.users + 1)
+            ),
+        )
+        seed_courses(conn, args, rng)
+        seed_activity(conn, args, rng)
+        return table_sizes(conn)
+
+
+def table_sizes(conn: sqlite3.Connection) -> dict[str, int]:
+    return {
+        table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        for table in (
+            "user",
+            "course",
+            "chapter",
+            "lesson",
+            "user_course",
+            "review",
+            "comment",
+        )
+    }
+
+
+class Dataset(NamedTuple):
+    usernames: dict[int, str]
+    enrollments: dict[int, list[int]]
+    authored: dict[int, list[int]]
+    lessons: dict[int, list[tuple[int, int]]]
+    sizes: dict[str, int]
+
+
+def load_dataset(path: str) -> Dataset:
+    enrollments = defaultdict(list)
+    authored = defaultdict(list)
+    lessons = defaultdict(list)
+    with sqlite3.connect(path) as conn:
+        usernames = dict(conn.execute("SELECT id, username FROM user"))
+        for user, course in conn.execute(
+            "SELECT user_id, course_id FROM user_course"
+        ):
+            enrollments[user].append(course)
+        for course, author in conn.execute("SELECT id, author_id FROM course"):
+            authored[author].append(course)
+        for lesson, chapter, course in conn.execute(
+            "SELECT id, chapter_id, course_id FROM lesson"
+        ):
+            lessons[course].append((chapter, lesson))
+        sizes = table_sizes(conn)
+    return Dataset(usernames, enrollments, authored, lessons, sizes)
+
+
+class ASGIClient:
+    """Client calling the app in process."""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def request(
+        self, method: str, path: str, headers: dict[str, str], body: object
+    ) -> tuple[int, bytes]:
+        return await call(self.app, method, path, headers, body)
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPClient:
+    """HTTP/1.1 client keeping one connection alive, like a browser tab."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(
+            self.host, self.port
+        )
+        self.connection = h11.Connection(h11.CLIENT)
+
+    async def request(
+        self, method: str, path: str, headers: dict[str, str], body: object
+    ) -> tuple[int, bytes]:
+        if self.writer is None:
+            await self.connect()
+        raw_headers = [(b"host", self.host.encode())]
+        payload = encode_body(body, raw_headers)
+        raw_headers.append((b"content-length", str(len(payload)).encode()))
+        for name, value in headers.items():
+            raw_headers.append((name.lower().encode(), value.encode()))
+
+        self.writer.write(
+            self.connection.send(
+                h11.Request(method=method, target=path, headers=raw_headers)
+            )
+            + self.connection.send(h11.Data(data=payload))
+            + self.connection.send(h11.EndOfMessage())
+        )
+        await self.writer.drain()
+        status, content = await self.read_response()
+
+        if self.connection.their_state is h11.DONE:
+            self.connection.start_next_cycle()
+        else:
+            await self.close()
+        return status, content
+
+    async def read_response(self) -> tuple[int, bytes]:
+        status = 0
+        chunks = []
+        event = self.connection.next_event()
+        while not isinstance(event, (h11.EndOfMessage, h11.ConnectionClosed)):
+            if event is h11.NEED_DATA:
+                self.connection.receive_data(await self.reader.read(65536))
+            elif isinstance(event, h11.Response):
+                status = event.status_code
+            elif isinstance(event, h11.Data):
+                chunks.append(event.data)
+            event = self.connection.next_event()
+        return status, b"".join(chunks)
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class Recorder:
+    """Latencies and statuses of every request by route template.
+
+    A request that raised has the name of the exception as its status.
+    """
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[int | str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+
+    def record(self, route: str, status: int | str, elapsed: float) -> None:
+        self.latencies[route].append(elapsed * 1000)
+        self.statuses[route][status] += 1
+
+    def errors(self, route: str) -> int:
+        return sum(
+            count
+            for status, count in self.statuses[route].items()
+            if not is_success(status)
+        )
+
+    def report(self, elapsed: float) -> dict[str, dict]:
+        return {
+            route: {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / elapsed, 2),
+                **{
+                    f"p{q}_ms": round(percentile(samples, q), 3)
+                    for q in (50, 95, 99)
+                },
+                "max_ms": round(max(samples), 3),
+                "errors": self.errors(route),
+                "statuses": {
+                    str(status): count
+                    for status, count in sorted(
+                        self.statuses[route].items(),
+                        key=lambda item: str(item[0]),
+                    )
+                },
+            }
+            for route, samples in sorted(self.latencies.items())
+        }
+
+
+def is_success(status: int | str) -> bool:
+    return isinstance(status, int) and 200 <= status < 300
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, ceil(q / 100 * len(ordered)) - 1)]
+
+
+class VirtualUser:
+    """One logged in user picking weighted actions until the deadline."""
+
+    def __init__(
+        self,
+        client: ASGIClient | HTTPClient,
+        user: int,
+        data: Dataset,
+        recorder: Recorder,
+        rng: random.Random,
+    ) -> None:
+        self.client = client
+        self.user = user
+        self.data = data
+        self.recorder = recorder
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+
+    async def request(
+        self,
+        method: str,
+        route: str,
+        body: object = None,
+        query: str = "",
+        **params: int,
+    ) -> bytes | None:
+        """Returns the body of a 2xx response and ``None`` on an error."""
+        status, content = await self.send(method, route, body, query, params)
+        return content if is_success(status) else None
+
+    async def send(
+        self,
+        method: str,
+        route: str,
+        body: object,
+        query: str,
+        params: dict[str, int],
+    ) -> tuple[int | str, bytes | None]:
+        path = route.format(**params)
+        if query:
+            path = f"{path}?{query}"
+        started = time.perf_counter()
+        try:
+            status, content = await self.client.request(
+                method, path, self.headers, body
+            )
+        except Exception as error:
+            # Counted against the route instead of ending the whole run,
+            # the next request of this user opens a new connection.
+            await self.client.close()
+            status, content = type(error).__name__, None
+        self.recorder.record(
+            f"{method} {route}", status, time.perf_counter() - started
+        )
+        return status, content
+
+    def pick_lesson(self) -> tuple[int, int, int]:
+        course = self.rng.choice(self.data.enrollments[self.user])
+        chapter, lesson = self.rng.choice(self.data.lessons[course])
+        return course, chapter, lesson
+
+    async def login(self) -> int | str:
+        """Keeps the previous token when the login fails."""
+        status, content = await self.send(
+            "POST",
+            "/auth/jwt/create",
+            {"username": self.data.usernames[self.user], "password": PASSWORD},
+            "",
+            {},
+        )
+        if is_success(status):
+            self.headers = {
+                "Authorization": f"Bearer {json.loads(content)['access']}"
+            }
+        return status
+
+    async def warm_up(self) -> None:
+        """Logs in, waiting out a busy hashing pool between attempts."""
+        while (status := await self.login()) == 503:
+            await asyncio.sleep(1)
+        if not is_success(status):
+            raise RuntimeError(
+                f"{self.data.usernames[self.user]} failed to log in: {status}"
+            )
+
+    async def browse_catalog(self) -> None:
+        content = await self.request("GET", "/catalog")
+        if content is None:
+            return
+        page = json.loads(content)
+        if page.get("next_cursor") and self.rng.random() < 0.3:
+            await self.request(
+                "GET", "/catalog", query=f"cursor={quote(page['next_cursor'])}"
+            )
+
+    async def search(self) -> None:
+        scope = self.rng.choice(("courses", "lessons"))
+        word = f"w{self.rng.randint(1, 2000)}"
+        await self.request(
+            "GET", "/catalog/search", query=f"q={word}&scope={scope}"
+        )
+
+    async def view_course(self) -> None:
+        course, _, _ = self.pick_lesson()
+        await self.request(
+            "GET", "/education/course/{course_id}", course_id=course
+        )
+        await self.request(
+            "GET", "/education/course/{course_id}/outline", course_id=course
+        )
+        await self.request(
+            "GET", "/education/course/{course_id}/reviews", course_id=course
+        )
+
+    async def read_lesson(self) -> None:
+        _, _, lesson = self.pick_lesson()
+        await self.request(
+            "GET", "/education/lesson/{lesson_id}", lesson_id=lesson
+        )
+        await self.request(
+            "GET", "/education/lesson/{lesson_id}/thread", lesson_id=lesson
+        )
+
+    async def comment(self) -> None:
+        _, _, lesson = self.pick_lesson()
+        await self.request(
+            "POST",
+            "/education/lesson/{lesson_id}/comment",
+            {"text": text(self.rng, 15)},
+            lesson_id=lesson,
+        )
+
+    async def my_courses(self) -> None:
+        await self.request("GET", "/education/courses")
+
+    async def author(self) -> None:
+        if not self.data.authored[self.user]:
+            await self.my_courses()
+            return
+        course = self.rng.choice(self.data.authored[self.user])
+        chapter, lesson = self.rng.choice(self.data.lessons[course])
+        await self.request(
+            "GET", "/teach/course/{course_id}/chapters", course_id=course
+        )
+        await self.request(
+            "PUT",
+            "/teach/course/{course_id}/chapter/{chapter_id}"
+            "/lesson/{lesson_id}",
+            {"content": text(self.rng, 200)},
+            course_id=course,
+            chapter_id=chapter,
+            lesson_id=lesson,
+        )
+
+    async def run(self, deadline: float) -> None:
+        actions, weights = zip(*WORKLOAD)
+        while time.perf_counter() < deadline:
+            action = self.rng.choices(actions, weights)[0]
+            await action(self)
+
+
+WORKLOAD: tuple[
+    tuple[Callable[[VirtualUser], Awaitable[object]], int], ...
+] = (
+    (VirtualUser.browse_catalog, 20),
+    (VirtualUser.search, 10),
+    (VirtualUser.view_course, 15),
+    (VirtualUser.read_lesson, 35),
+    (VirtualUser.comment, 5),
+    (VirtualUser.my_courses, 5),
+    (VirtualUser.author, 5),
+    (VirtualUser.login, 1),
+)
+
+
+def create_app(db: str) -> Callable:
+    os.environ["DBURL"] = f"sqlite+aiosqlite:///{db}"
+    # Imported here, the app reads its config once on import.
+    from api.main import memourse
+
+    return memourse.create_app()
+
+
+def port_is_open(port: int) -> bool:
+    try:
+        socket.create_connection(("127.0.0.1", port), timeout=1).close()
+    except OSError:
+        return False
+    return True
+
+
+def start_uvicorn(db: str, port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "api.main:memourse.create_app",
+            "--factory",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={
+            **os.environ,
+            "DBURL": f"sqlite+aiosqlite:///{db}",
+            "PORT": str(port),
+        },
+    )
+    while not port_is_open(port):
+        if server.poll() is not None:
+            sys.exit(f"uvicorn exited with {server.returncode}")
+        time.sleep(0.1)
+    return server
+
+
+async def timed(
+    virtual_users: list[VirtualUser],
+    phase: Callable[[VirtualUser], Awaitable[None]],
+) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    for virtual_user in virtual_users:
+        virtual_user.recorder = recorder
+    started = time.perf_counter()
+    await asyncio.gather(*(phase(user) for user in virtual_users))
+    return recorder, time.perf_counter() - started
+
+
+async def drive(
+    args: argparse.Namespace, data: Dataset, app: Callable | None
+) -> tuple[tuple[Recorder, float], tuple[Recorder, float]]:
+    """Returns the recorders and durations of the warm-up and the run.
+
+    Logins of every user come first, so the burst of bcrypt work they
+    cause is not mixed into the latencies of the workload.
+    """
+    rng = random.Random(args.seed)
+    users = sorted(data.enrollments)
+    users = rng.sample(users, min(args.concurrency, len(users)))
+    clients = [
+        ASGIClient(app) if app else HTTPClient("127.0.0.1", args.port)
+        for _ in users
+    ]
+    virtual_users = [
+        VirtualUser(
+            client, user, data, Recorder(), random.Random(rng.random())
+        )
+        for client, user in zip(clients, users)
+    ]
+    try:
+        warm_up = await timed(virtual_users, VirtualUser.warm_up)
+        deadline = time.perf_counter() + args.duration
+        workload = await timed(virtual_users, lambda user: user.run(deadline))
+    finally:
+        for client in clients:
+            await client.close()
+    return warm_up, workload
+
+
+def run(args: argparse.Namespace) -> dict[str, object]:
+    data = load_dataset(args.db)
+    server = start_uvicorn(args.db, args.port) if args.uvicorn else None
+    try:
+        app = None if server else create_app(args.db)
+        warm_up, (recorder, elapsed) = asyncio.run(drive(args, data, app))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    routes = recorder.report(elapsed)
+    total = sum(route["requests"] for route in routes.values())
+    return {
+        "label": args.label,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target": "uvicorn" if args.uvicorn else "asgi",
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 3),
+        "dataset": data.sizes,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "routes": routes,
+        "warm_up": {
+            "duration_s": round(warm_up[1], 3),
+            "routes": warm_up[0].report(warm_up[1]),
+        },
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seeding = commands.add_parser("seed", help="create a synthetic database")
+    seeding.add_argument("db")
+    seeding.add_argument("--users", type=int, default=1000)
+    seeding.add_argument("--courses", type=int, default=100)
+    seeding.add_argument("--chapters", type=int, default=5, help="per course")
+    seeding.add_argument("--lessons", type=int, default=10, help="per chapter")
+    seeding.add_argument("--enrollments", type=int, default=5, help="per user")
+    seeding.add_argument("--reviews", type=int, default=10, help="per course")
+    seeding.add_argument("--comments", type=int, default=2, help="per lesson")
+    seeding.add_argument(
+        "--replies", type=int, default=3, help="per root comment"
+    )
+    seeding.add_argument("--seed", type=int, default=0)
+
+    running = commands.add_parser("run", help="drive a mixed workload")
+    running.add_argument("db")
+    running.add_argument("--concurrency", type=int, default=16)
+    running.add_argument("--duration", type=float, default=30)
+    running.add_argument("--uvicorn", action="store_true")
+    running.add_argument("--port", type=int, default=8765)
+    running.add_argument("--label", default="")
+    running.add_argument("--output", help="write the JSON report here")
+    running.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "seed":
+        print(json.dumps(seed(args), indent=2))
+        return
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
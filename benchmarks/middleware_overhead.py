@@ -0,0 +1,127 @@
+"""Benchmark per-request overhead of the session and JWT middlewares.
+
+Compares the former ``BaseHTTPMiddleware`` based middlewares with the
+pure ASGI ones from ``api.middlewares`` on an endpoint that never touches
+the database, such as ``/docs`` or ``/openapi.json``.
+
+Usage::
+
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI, Request
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message
+
+from api.auth.token_service import AuthJWT
+from api.middlewares import DatabaseMiddleware, JWTMiddleware
+
+
+class LegacyDatabaseMiddleware:
+    def __init__(self, session: async_sessionmaker) -> None:
+        self.session = session
+
+    async def __call__(
+        self,
+        request: Request,
+        call_next: Callable[[Request], Awaitable[Response]],
+    ) -> Response:
+        async with self.session() as session:
+            request.state.session = session
+            return await call_next(request)
+
+
+class LegacyJWTMiddleware:
+    def __init__(self, jwt_service: AuthJWT) -> None:
+        self.jwt_service = jwt_service
+
+    async def __call__(
+        self,
+        request: Request,
+        call_next: Callable[[Request], Awaitable[Response]],
+    ) -> Response:
+        request.state.jwt_service = self.jwt_service
+        return await call_next(request)
+
+
+def create_app(legacy: bool, session: async_sessionmaker) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    jwt_service = AuthJWT("SECRETKEY", "HS256")
+    if legacy:
+        app.add_middleware(
+            BaseHTTPMiddleware, dispatch=LegacyDatabaseMiddleware(session)
+        )
+        app.add_middleware(
+            BaseHTTPMiddleware, dispatch=LegacyJWTMiddleware(jwt_service)
+        )
+    else:
+        app.add_middleware(DatabaseMiddleware, session_maker=session)
+        app.add_middleware(JWTMiddleware, jwt_service=jwt_service)
+    return app
+
+
+async def request(app: ASGIApp) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app: ASGIApp, requests: int) -> float:
+    for _ in range(min(requests, 500)):
+        await request(app)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await request(app)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main(requests: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    session = async_sessionmaker(bind=engine)
+
+    legacy = await measure(create_app(True, session), requests)
+    asgi = await measure(create_app(False, session), requests)
+    await engine.dispose()
+
+    print(f"BaseHTTPMiddleware: {legacy:8.1f} us/request")
+    print(f"pure ASGI:          {asgi:8.1f} us/request")
+    print(f"saved:              {legacy - asgi:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,369 @@
+"""Replay captured traffic and compare latencies between two builds.
+
+Traces are written by ``api.middlewares.TrafficCaptureMiddleware`` when
+``TRAFFICCAPTUREFILE`` is set. ``run`` copies the given SQLite database,
+so every replay starts from the same state, and reissues the traces in
+order against the app in process or a local uvicorn, at their original
+pace or ``--speed`` times faster. Requests are sent on schedule whether
+or not earlier ones have finished, like real clients. Each user gets a
+fresh token for the id it had when captured, and the placeholders of
+sanitized bodies are filled with values the API accepts, see
+``Placeholders``. ``compare`` prints the latency percentiles of two
+reports per route.
+
+Usage::
+
+    python -m benchmarks.replay run traces.jsonl load.db --output base.json
+    git checkout feature
+    python -m benchmarks.replay run traces.jsonl load.db --output head.json
+    python -m benchmarks.replay compare base.json head.json
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+import itertools
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+from api.auth.token_service import AuthJWT
+from api.config import Config
+
+from .loadtest import (
+    ASGIClient,
+    create_app,
+    HTTPClient,
+    PASSWORD,
+    Recorder,
+    start_uvicorn,
+)
+
+
+LOGIN_ROUTE = "/auth/jwt/create"
+
+
+def load_traces(path: str) -> list[dict[str, Any]]:
+    with open(path, encoding="utf-8") as file:
+        traces = [json.loads(line) for line in file if line.strip()]
+    # Requests that matched no route cannot be rebuilt from a template.
+    return sorted(
+        (trace for trace in traces if trace["route"] is not None),
+        key=lambda trace: trace["ts"],
+    )
+
+
+def copy_database(source: str) -> str:
+    target = os.path.join(tempfile.mkdtemp(), os.path.basename(source))
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+    return target
+
+
+class Placeholders:
+    """Expands the typed placeholders of captured bodies and queries.
+
+    Logins get the username of the captured subject and ``password``, and
+    refreshes a refresh token of that user, so both succeed again. Other
+    usernames and emails are new for every request, dates lie a year
+    ahead, text of the captured length is built from course and lesson
+    names, and searches get as many terms taken from the same names.
+    """
+
+    def __init__(self, db: str, user_ids: set[int], password: str) -> None:
+        config = Config(_env_file=".env")
+        jwt_service = AuthJWT(config.SECRETKEY, config.JWTALGORITHM, 0)
+        with sqlite3.connect(db) as conn:
+            users = {
+                user_id: {"id": user_id, "username": username, "email": email}
+                for user_id, username, email in conn.execute(
+                    "SELECT id, username, email FROM user"
+                )
+            }
+            names = conn.execute(
+                "SELECT name FROM course UNION ALL SELECT name FROM lesson"
+            ).fetchall()
+        payloads = {
+            user_id: users.get(
+                user_id, {"id": user_id, "username": "", "email": ""}
+            )
+            for user_id in user_ids
+        }
+        self.access_tokens = {
+            user_id: jwt_service.create_access_token(payload)
+            for user_id, payload in payloads.items()
+        }
+        self.refresh_tokens = {
+            user_id: jwt_service.create_refresh_token(payload)
+            for user_id, payload in payloads.items()
+        }
+        self.usernames = {
+            user_id: payload["username"]
+            for user_id, payload in payloads.items()
+        }
+        self.constants = {
+            "password": password,
+            "date": (date.today() + timedelta(days=365)).isoformat(),
+        }
+        self.words = sorted(
+            {word for (name,) in names for word in name.split() if word}
+        ) or ["replay"]
+        # Seeded, so every build replays the same values.
+        self.random = random.Random(0)
+        self.serial = itertools.count()
+
+    def fill(self, value: object, trace: dict[str, Any]) -> object:
+        if isinstance(value, dict):
+            return {key: self.fill(item, trace) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.fill(item, trace) for item in value]
+        if isinstance(value, str) and value.startswith("<"):
+            return self.expand(value, trace)
+        return value
+
+    def expand(self, value: str, trace: dict[str, Any]) -> str:
+        kind, _, size = value[1:-1].partition(":")
+        if kind in self.constants:
+            return self.constants[kind]
+        if kind in ("token", "username", "email"):
+            return self.credential(kind, trace)
+        if kind == "search":
+            return " ".join(self.random.choices(self.words, k=int(size)))
+        if kind == "text":
+            return self.text(int(size))
+        return value
+
+    def credential(self, kind: str, trace: dict[str, Any]) -> str:
+        if kind == "token":
+            return self.refresh_tokens.get(trace["user"], "")
+        if kind == "username" and trace["route"] == LOGIN_ROUTE:
+            return self.usernames.get(trace["user"], "")
+        name = f"replay{next(self.serial)}"
+        return name if kind == "username" else f"{name}@example.com"
+
+    def text(self, size: int) -> str:
+        """Text of ``size`` characters ending in a serial number.
+
+        The number keeps names unique unless ``size`` is too short for it.
+        """
+        if not size:
+            return ""
+        suffix = f" {next(self.serial)}"
+        words = []
+        length = 0
+        while length < size:
+            word = self.random.choice(self.words)
+            words.append(word)
+            length += len(word) + 1
+        text = " ".join(words)[: max(size - len(suffix), 0)] + suffix
+        return text[-size:]
+
+
+class ClientPool:
+    """Reuses idle clients and opens another one when all are busy."""
+
+    def __init__(self, factory: Callable[[], ASGIClient | HTTPClient]) -> None:
+        self.factory = factory
+        self.idle: list[ASGIClient | HTTPClient] = []
+        self.clients: list[ASGIClient | HTTPClient] = []
+
+    async def request(
+        self, method: str, path: str, headers: dict[str, str], body: object
+    ) -> tuple[int, bytes]:
+        if self.idle:
+            client = self.idle.pop()
+        else:
+            client = self.factory()
+            self.clients.append(client)
+        try:
+            return await client.request(method, path, headers, body)
+        finally:
+            self.idle.append(client)
+
+    async def close(self) -> None:
+        for client in self.clients:
+            await client.close()
+
+
+class Replayer:
+    def __init__(
+        self, pool: ClientPool, placeholders: Placeholders, speed: float
+    ) -> None:
+        self.pool = pool
+        self.placeholders = placeholders
+        self.speed = speed
+        self.recorder = Recorder()
+        self.mismatches = 0
+        self.max_lag = 0.0
+
+    def prepare(
+        self, trace: dict[str, Any]
+    ) -> tuple[str, dict[str, str], object]:
+        path = trace["route"].format(**trace["params"])
+        if trace["query"]:
+            query = self.placeholders.fill(trace["query"], trace)
+            path = f"{path}?{urlencode(query)}"
+        headers = {}
+        if trace["user"] is not None:
+            token = self.placeholders.access_tokens[trace["user"]]
+            headers["Authorization"] = f"Bearer {token}"
+        return path, headers, self.placeholders.fill(trace["body"], trace)
+
+    async def replay_one(
+        self,
+        trace: dict[str, Any],
+        path: str,
+        headers: dict[str, str],
+        body: object,
+    ) -> None:
+        started = time.perf_counter()
+        status, _ = await self.pool.request(
+            trace["method"], path, headers, body
+        )
+        self.recorder.record(
+            f"{trace['method']} {trace['route']}",
+            status,
+            time.perf_counter() - started,
+        )
+        self.mismatches += status != trace["status"]
+
+    async def replay(self, traces: list[dict[str, Any]]) -> float:
+        first = traces[0]["ts"]
+        started = time.perf_counter()
+        tasks = []
+        for trace in traces:
+            due = started + (trace["ts"] - first) / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.max_lag = max(self.max_lag, -delay)
+            # Filled in capture order, so every build gets the same values.
+            request = self.prepare(trace)
+            tasks.append(asyncio.create_task(self.replay_one(trace, *request)))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+
+async def drive(
+    args: argparse.Namespace,
+    traces: list[dict[str, Any]],
+    placeholders: Placeholders,
+    app: Callable | None,
+) -> tuple[Replayer, float]:
+    if app is None:
+        pool = ClientPool(lambda: HTTPClient("127.0.0.1", args.port))
+    else:
+        client = ASGIClient(app)
+        pool = ClientPool(lambda: client)
+    replayer = Replayer(pool, placeholders, args.speed)
+    elapsed = await replayer.replay(traces)
+    await pool.close()
+    return replayer, elapsed
+
+
+def run(args: argparse.Namespace) -> dict[str, object]:
+    traces = load_traces(args.traces)
+    if not traces:
+        sys.exit(f"no replayable traces in {args.traces}")
+    db = copy_database(args.db)
+    placeholders = Placeholders(
+        db,
+        {trace["user"] for trace in traces if trace["user"] is not None},
+        args.password,
+    )
+
+    server = start_uvicorn(db, args.port) if args.uvicorn else None
+    try:
+        app = None if server else create_app(db)
+        replayer, elapsed = asyncio.run(drive(args, traces, placeholders, app))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    return {
+        "label": args.label,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target": "uvicorn" if args.uvicorn else "asgi",
+        "speed": args.speed,
+        "captured_s": round(traces[-1]["ts"] - traces[0]["ts"], 3),
+        "duration_s": round(elapsed, 3),
+        "requests": len(traces),
+        "throughput_rps": round(len(traces) / elapsed, 2),
+        "max_schedule_lag_ms": round(replayer.max_lag * 1000, 3),
+        "status_mismatches": replayer.mismatches,
+        "routes": replayer.recorder.report(elapsed),
+    }
+
+
+def change(base: float, head: float) -> str:
+    if not base:
+        return ""
+    return f"{(head - base) / base * 100:+.1f}%"
+
+
+def compare(base_path: str, head_path: str) -> None:
+    with open(base_path) as base_file, open(head_path) as head_file:
+        base = json.load(base_file)["routes"]
+        head = json.load(head_file)["routes"]
+
+    print(f"{'route':64} {'':>4} {'base ms':>9} {'head ms':>9} {'change':>8}")
+    for route in sorted(base.keys() & head.keys()):
+        for q in ("p50", "p95", "p99"):
+            before = base[route][f"{q}_ms"]
+            after = head[route][f"{q}_ms"]
+            print(
+                f"{route:64} {q:>4} {before:9.2f} {after:9.2f} "
+                f"{change(before, after):>8}"
+            )
+    for route in sorted(base.keys() ^ head.keys()):
+        print(f"{route:64} only in {'base' if route in base else 'head'}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    running = commands.add_parser("run", help="replay captured traces")
+    running.add_argument("traces")
+    running.add_argument("db", help="SQLite database, copied before replay")
+    running.add_argument(
+        "--speed", type=float, default=1.0, help="2 replays twice as fast"
+    )
+    running.add_argument("--uvicorn", action="store_true")
+    running.add_argument("--port", type=int, default=8765)
+    running.add_argument("--label", default="")
+    running.add_argument(
+        "--password",
+        default=PASSWORD,
+        help="password of every user in the database, for replayed logins",
+    )
+    running.add_argument("--output", help="write the JSON report here")
+
+    comparing = commands.add_parser("compare", help="compare two reports")
+    comparing.add_argument("base")
+    comparing.add_argument("head")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "compare":
+        compare(args.base, args.head)
+        return
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark list response serialization for every API schema.
+
+For each pydantic model in ``api.education.schemas`` and
+``api.teaching.schemas`` a list of attribute rows is serialized the way
+FastAPI does for a ``response_model`` (validate, dump to Python objects,
+``JSONResponse``) and with ``api.serialization.JSONSerializer``.
+
+Usage::
+
+    python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime
+import time
+from types import SimpleNamespace, UnionType
+from typing import Awaitable, Callable, get_args, get_origin, Literal, Union
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import BaseModel
+
+from api.education import schemas as education_schemas
+from api.serialization import JSONSerializer
+from api.teaching import schemas as teaching_schemas
+
+
+VALUES = {
+    bool: True,
+    int: 42,
+    float: 1.5,
+    str: "lorem ipsum dolor",
+    date: date(2030, 1, 1),
+    datetime: datetime(2030, 1, 1, 12, 30),
+}
+
+
+def collect_schemas() -> dict[str, type[BaseModel]]:
+    schemas = {}
+    for module in (education_schemas, teaching_schemas):
+        prefix = module.__name__.split(".")[1]
+        for name, value in vars(module).items():
+            if (
+                isinstance(value, type)
+                and issubclass(value, BaseModel)
+                and value.__module__ == module.__name__
+            ):
+                schemas[f"{prefix}.{name}"] = value
+    return schemas
+
+
+def unwrap(annotation: object) -> object:
+    if get_origin(annotation) in (Union, UnionType):
+        return next(
+            arg for arg in get_args(annotation) if arg is not type(None)
+        )
+    return annotation
+
+
+def sample(annotation: object, depth: int = 0) -> object:
+    """Build an attribute row, like an ORM object, for ``annotation``."""
+    annotation = unwrap(annotation)
+    args = get_args(annotation)
+    if get_origin(annotation) is Literal:
+        return args[0]
+    if get_origin(annotation) is list:
+        return [sample(args[0], depth + 1) for _ in range(3 if depth else 5)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return sample_model(annotation, depth)
+    return VALUES.get(annotation, "lorem ipsum dolor")
+
+
+def sample_model(schema: type[BaseModel], depth: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        **{
+            name: (
+                []
+                if depth > 1 and get_origin(field.annotation) is list
+                else sample(field.annotation, depth + 1)
+            )
+            for name, field in schema.model_fields.items()
+        }
+    )
+
+
+async def best_of(repeat: int, func: Callable[[], Awaitable]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1e3
+
+
+async def measure(
+    schema: type[BaseModel], rows: int, repeat: int
+) -> tuple[float, float]:
+    content = [sample(schema) for _ in range(rows)]
+    field = create_model_field(
+        name="Response", type_=list[schema], mode="serialization"
+    )
+    serializer = JSONSerializer(list[schema])
+
+    async def fastapi_path() -> bytes:
+        response_content = await serialize_response(
+            field=field, response_content=content
+        )
+        return JSONResponse(response_content).body
+
+    async def serializer_path() -> bytes:
+        return serializer.dump(content)
+
+    assert await fastapi_path() == await serializer_path()
+    return (
+        await best_of(repeat, fastapi_path),
+        await best_of(repeat, serializer_path),
+    )
+
+
+async def main(rows: int, repeat: int) -> None:
+    print(f"{rows} rows per response, ms per response")
+    print(f"{'schema':40} {'fastapi':>9} {'serializer':>11} {'speedup':>8}")
+    for name, schema in collect_schemas().items():
+        default, fast = await measure(schema, rows, repeat)
+        print(f"{name:40} {default:9.2f} {fast:11.2f} {default / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
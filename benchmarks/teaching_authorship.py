@@ -0,0 +1,159 @@
+"""Benchmark ownership checks of nested teaching routes.
+
+Seeds a temporary SQLite database, measures the latency of the teaching
+routes through the whole app and compares the former chain of
+``EXISTS`` queries with the single joined authorship query.
+
+Usage::
+
+    python -m benchmarks.teaching_authorship --requests 2000
+"""
+
+import argparse
+import asyncio
+from datetime import date
+import os
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("JWTALGORITHM", "HS256")
+os.environ["DBURL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from sqlalchemy import exists, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from api.database import Base  # noqa: E402
+from api.main import memourse  # noqa: E402
+from api.models import Chapter, Course, Lesson, User  # noqa: E402
+from api.teaching.dependencies import authorship_is_confirmed  # noqa: E402
+
+from .asgi import call  # noqa: E402
+
+
+async def seed() -> tuple[int, int, int, int]:
+    async with memourse.db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with memourse.db.session() as session:
+        user = User(username="author", email="a@example.com", password="-")
+        course = Course(
+            name="Course",
+            date_started=date.today(),
+            language="en",
+            author=user,
+        )
+        chapter = Chapter(name="Chapter", course=course)
+        session.add_all([user, course, chapter])
+        await session.flush()
+
+        lesson = Lesson(
+            name="Lesson",
+            content="text",
+            chapter_id=chapter.id,
+            course_id=course.id,
+        )
+        session.add(lesson)
+        await session.flush()
+        ids = user.id, course.id, chapter.id, lesson.id
+        await session.commit()
+        return ids
+
+
+async def legacy_chain(
+    session: AsyncSession, author_id: int, ids: tuple[int, int, int]
+) -> bool:
+    course_id, chapter_id, lesson_id = ids
+    return (
+        await session.scalar(
+            select(
+                exists().where(
+                    Course.id == course_id, Course.author_id == author_id
+                )
+            )
+        )
+        and await session.scalar(
+            select(
+                exists().where(
+                    Chapter.course_id == course_id, Chapter.id == chapter_id
+                )
+            )
+        )
+        and await session.scalar(
+            select(
+                exists().where(
+                    Lesson.chapter_id == chapter_id, Lesson.id == lesson_id
+                )
+            )
+        )
+    )
+
+
+def report(name: str, samples: list[float]) -> None:
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{name:<58} p50 {statistics.median(samples):8.1f} us"
+        f"  p95 {p95:8.1f} us"
+    )
+
+
+async def measure_routes(
+    requests: int, author_id: int, ids: tuple[int, int, int]
+) -> None:
+    app = memourse.create_app()
+    course_id, chapter_id, lesson_id = ids
+    token = memourse.auth_jwt.create_access_token(
+        {"id": author_id, "username": "author", "email": "a@example.com"}
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    chapter = f"/teach/course/{course_id}/chapter/{chapter_id}"
+    routes = [
+        ("GET", f"/teach/course/{course_id}", None),
+        ("GET", f"/teach/course/{course_id}/chapters", None),
+        ("GET", f"{chapter}/lessons", None),
+        ("PUT", f"{chapter}/lesson/{lesson_id}", {"content": "text"}),
+    ]
+    for method, path, body in routes:
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            status, _ = await call(app, method, path, headers, body)
+            samples.append((time.perf_counter() - started) * 1e6)
+            assert status == 200, status
+        report(f"{method} {path}", samples)
+
+
+async def measure_checks(
+    requests: int, author_id: int, ids: tuple[int, int, int]
+) -> None:
+    async with memourse.db.session() as session:
+        for name, check in (
+            ("lesson ownership, 3 EXISTS queries", legacy_chain),
+            (
+                "lesson ownership, 1 joined query",
+                lambda s, a, i: authorship_is_confirmed(s, a, *i),
+            ),
+        ):
+            samples = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                assert await check(session, author_id, ids)
+                samples.append((time.perf_counter() - started) * 1e6)
+            report(name, samples)
+
+
+async def main(requests: int) -> None:
+    author_id, *ids = await seed()
+    await measure_routes(requests, author_id, tuple(ids))
+    await measure_checks(requests, author_id, tuple(ids))
+    await memourse.db.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,267 @@
+"""Fixtures running the whole app in process against a seeded database.
+
+Every test module gets its own SQLite file and app instance, so modules
+that create or delete rows do not affect each other.
+"""
+
+from collections.abc import Callable, Iterator
+from datetime import date
+import os
+
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("JWTALGORITHM", "HS256")
+
+from fastapi.testclient import TestClient  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Connection  # noqa: E402
+from sqlalchemy.engine.interfaces import DBAPICursor  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from api.auth.service import pwd  # noqa: E402
+from api.cache import caches  # noqa: E402
+from api.database import Base  # noqa: E402
+from api.education.models import UserCourse  # noqa: E402
+from api.main import Memourse  # noqa: E402
+from api.models import (  # noqa: E402
+    Chapter,
+    Comment,
+    Course,
+    Lesson,
+    Review,
+    User,
+)
+
+PEERS = 10
+CHAPTERS = 5
+LESSONS = 5
+
+query_table_key = pytest.StashKey[list[tuple[str, int, int, int]]]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--query-table",
+        action="store_true",
+        help="print the statements, budget and rows of every route",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[query_table_key] = []
+
+
+def pytest_terminal_summary(
+    terminalreporter: pytest.TerminalReporter, config: pytest.Config
+) -> None:
+    rows = config.stash[query_table_key]
+    if not config.getoption("query_table") or not rows:
+        return
+    terminalreporter.section("query budget")
+    terminalreporter.line(
+        f"{'route':72} {'queries':>7} {'budget':>6} {'rows':>6}"
+    )
+    for route, statements, budget, row_count in rows:
+        terminalreporter.line(
+            f"{route:72} {statements:7} {budget:6} {row_count:6}"
+        )
+
+
+@pytest.fixture(scope="session")
+def query_table(
+    pytestconfig: pytest.Config,
+) -> list[tuple[str, int, int, int]]:
+    """Rows of the ``--query-table`` report, appended by budget tests."""
+    return pytestconfig.stash[query_table_key]
+
+
+@pytest.fixture(scope="module")
+def memourse(tmp_path_factory: pytest.TempPathFactory) -> Memourse:
+    path = tmp_path_factory.mktemp("db") / "test.db"
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("DBURL", f"sqlite+aiosqlite:///{path}")
+        # The author is the first user seeded.
+        patch.setenv("ADMINIDS", "[1]")
+        return Memourse()
+
+
+@pytest.fixture(scope="module")
+def client(memourse: Memourse) -> Iterator[TestClient]:
+    with TestClient(memourse.create_app()) as client:
+        yield client
+        client.portal.call(memourse.db.read_engine.dispose)
+        client.portal.call(memourse.db.engine.dispose)
+    for cache in caches.values():
+        cache.clear()
+
+
+@pytest.fixture(scope="module")
+def ids(memourse: Memourse, client: TestClient) -> dict[str, int]:
+    return client.portal.call(seed, memourse)
+
+
+@pytest.fixture(scope="module")
+def auth_headers(
+    memourse: Memourse, ids: dict[str, int]
+) -> Callable[[str | None], dict[str, str]]:
+    """Access token headers for one of the seeded users by name."""
+
+    def headers(user: str | None) -> dict[str, str]:
+        if user is None:
+            return {}
+        payload = {"id": ids[user], "username": user, "email": ""}
+        token = memourse.auth_jwt.create_access_token(payload)
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.rows = 0
+
+    def reset(self) -> None:
+        self.statements = self.rows = 0
+
+    def after(
+        self,
+        conn: Connection,
+        cursor: DBAPICursor,
+        *args: object,
+    ) -> None:
+        self.statements += 1
+        # The aiosqlite adapter buffers the whole result on execute.
+        self.rows += len(getattr(cursor, "_rows", None) or ())
+
+
+@pytest.fixture(scope="module")
+def counter(memourse: Memourse) -> Iterator[StatementCounter]:
+    counter = StatementCounter()
+    engines = {memourse.db.engine, memourse.db.read_engine}
+    for engine in engines:
+        event.listen(engine.sync_engine, "after_cursor_execute", counter.after)
+    yield counter
+    for engine in engines:
+        event.remove(engine.sync_engine, "after_cursor_execute", counter.after)
+
+
+async def seed(memourse: Memourse) -> dict[str, int]:
+    """Author with a course and a spare one, enrolled learners and peers.
+
+    Every user has the password ``password``. Returns the ids tests refer
+    to by name.
+    """
+    async with memourse.db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    password = pwd.hash("password")
+    async with memourse.db.session() as session:
+        users = [
+            User(username=name, email=f"{name}@example.com", password=password)
+            for name in ["author", "learner", "leaver"]
+            + [f"peer{i}" for i in range(PEERS)]
+        ]
+        session.add_all(users)
+        await session.flush()
+        author, learner, leaver, *peers = users
+
+        course, spare = (
+            Course(
+                name=name,
+                date_started=date(2030, 1, 1),
+                language="en",
+                author_id=author.id,
+            )
+            for name in ("Course", "Spare")
+        )
+        session.add_all([course, spare])
+        await session.flush()
+
+        lessons = await seed_chapters(session, course)
+        comment_id, review_id = await seed_activity(
+            session, course, lessons[0], [learner, *peers]
+        )
+        ids = {
+            "author": author.id,
+            "learner": learner.id,
+            "leaver": leaver.id,
+            "course": course.id,
+            "spare": spare.id,
+            "chapter": lessons[0].chapter_id,
+            "last_chapter": lessons[-1].chapter_id,
+            "lesson": lessons[0].id,
+            "last_lesson": lessons[-1].id,
+            "comment": comment_id,
+            "review": review_id,
+        }
+        await session.commit()
+        return ids
+
+
+async def seed_chapters(session: AsyncSession, course: Course) -> list[Lesson]:
+    chapters = [
+        Chapter(name=f"Chapter {i}", course_id=course.id)
+        for i in range(CHAPTERS)
+    ]
+    session.add_all(chapters)
+    await session.flush()
+    course.chapters_sequense = [chapter.id for chapter in chapters]
+
+    lessons = [
+        Lesson(
+            name=f"Lesson {i}",
+            content="lesson text " * 50,
+            chapter_id=chapter.id,
+            course_id=course.id,
+        )
+        for chapter in chapters
+        for i in range(LESSONS)
+    ]
+    session.add_all(lessons)
+    await session.flush()
+    for chapter in chapters:
+        chapter.lessons_sequence = [
+            lesson.id for lesson in lessons if lesson.chapter_id == chapter.id
+        ]
+    return lessons
+
+
+async def seed_activity(
+    session: AsyncSession, course: Course, lesson: Lesson, users: list[User]
+) -> tuple[int, int]:
+    """Enroll ``users`` and give each a review and a replied comment.
+
+    Every row has its own author, so a dropped eager load shows up as one
+    extra query per row.
+    """
+    session.add_all(
+        UserCourse(user_id=user.id, course_id=course.id) for user in users
+    )
+    reviews = [
+        Review(text="review", author_id=user.id, course_id=course.id)
+        for user in users
+    ]
+    comments = [
+        Comment(
+            text="comment",
+            lesson_id=lesson.id,
+            course_id=course.id,
+            author_id=user.id,
+        )
+        for user in users
+    ]
+    session.add_all(reviews + comments)
+    await session.flush()
+    session.add_all(
+        Comment(
+            text="reply",
+            lesson_id=lesson.id,
+            course_id=course.id,
+            author_id=user.id,
+            parent_comment_id=comment.id,
+        )
+        for comment in comments
+        for user in users[:3]
+    )
+    return comments[0].id, reviews[0].id
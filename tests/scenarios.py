@@ -0,0 +1,223 @@
+"""One request per API route, with its SQL statement budget.
+
+Requests run in this order against the database of ``conftest.seed``,
+deletes last so the others still find their rows.
+"""
+
+from collections.abc import Callable
+import json
+from typing import Any, NamedTuple
+
+from api.auth.token_service import AuthJWT
+
+from .conftest import CHAPTERS, LESSONS
+
+EXPORT = b"".join(
+    json.dumps(line).encode() + b"\n"
+    for line in (
+        {
+            "type": "course",
+            "id": 1,
+            "name": "Imported",
+            "date_started": "2030-01-01",
+            "language": "en",
+            "chapters_sequense": [1],
+        },
+        {
+            "type": "chapter",
+            "id": 1,
+            "name": "Imported",
+            "lessons_sequence": [1],
+        },
+        {
+            "type": "lesson",
+            "id": 1,
+            "chapter_id": 1,
+            "name": "Imported",
+            "content": "text",
+        },
+    )
+)
+
+
+class Scenario(NamedTuple):
+    """``body`` may be a function of the seeded ids, ``params`` maps path
+    parameters to the names of seeded ids.
+    """
+
+    method: str
+    route: str
+    user: str | None
+    budget: int
+    body: object | Callable[[dict[str, int]], object] = None
+    status: int = 200
+    params: dict[str, str] | None = None
+    query: str = ""
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.route}"
+
+    def path(self, ids: dict[str, int]) -> str:
+        params = {
+            "user_id": ids["author"],
+            "course_id": ids["course"],
+            "chapter_id": ids["chapter"],
+            "lesson_id": ids["lesson"],
+            "comment_id": ids["comment"],
+            "review_id": ids["review"],
+        }
+        for name, key in (self.params or {}).items():
+            params[name] = ids[key]
+        path = self.route.format(**params)
+        return f"{path}?{self.query}" if self.query else path
+
+    def content(
+        self, ids: dict[str, int], jwt_service: AuthJWT
+    ) -> dict[str, Any]:
+        """Keyword arguments of ``TestClient.request`` for the body."""
+        body = self.body(ids) if callable(self.body) else self.body
+        if self.user == "refresh":
+            payload = {
+                "id": ids["learner"],
+                "username": "learner",
+                "email": "",
+            }
+            body = {"refresh": jwt_service.create_refresh_token(payload)}
+        if body is None:
+            return {}
+        if isinstance(body, bytes):
+            return {"content": body}
+        return {"json": body}
+
+
+REGISTER = {
+    "username": "new",
+    "email": "new@example.com",
+    "password": "password",
+}
+LOGIN = {"username": "learner", "password": "password"}
+COURSE = {"name": "New", "language": "en", "date_started": "2030-01-01"}
+LESSON = {"name": "New", "content": "text"}
+OUTLINE = [{"name": "Bulk", "lessons": [LESSON] * LESSONS}] * CHAPTERS
+LAST_LESSON = {"chapter_id": "last_chapter", "lesson_id": "last_lesson"}
+TEACH = "/teach/course/{course_id}"
+CHAPTER = f"{TEACH}/chapter/{{chapter_id}}"
+
+SCENARIOS = [
+    Scenario("POST", "/auth/register", None, 4, REGISTER),
+    Scenario("POST", "/auth/jwt/create", None, 1, LOGIN),
+    Scenario("POST", "/auth/jwt/refresh", "refresh", 0),
+    Scenario("GET", "/profile", "learner", 1),
+    Scenario("GET", "/profile/{user_id}", "learner", 1),
+    Scenario("PUT", "/profile", "learner", 2, {"first_name": "Lea"}),
+    Scenario("GET", "/catalog", "learner", 2),
+    Scenario(
+        "GET",
+        "/catalog/search",
+        "learner",
+        2,
+        query="q=lesson&scope=lessons",
+    ),
+    Scenario("GET", "/education/courses", "learner", 1),
+    Scenario(
+        "POST",
+        "/education/add-course",
+        "learner",
+        2,
+        lambda ids: {"text": "", "course_id": ids["spare"]},
+        201,
+    ),
+    Scenario("GET", "/education/course/{course_id}", "learner", 3),
+    Scenario("GET", "/education/course/{course_id}/outline", "learner", 4),
+    Scenario("GET", "/education/chapter/{chapter_id}/lessons", "learner", 3),
+    Scenario("GET", "/education/lesson/{lesson_id}", "learner", 4),
+    Scenario("GET", "/education/course/{course_id}/reviews", "learner", 2),
+    Scenario(
+        "POST",
+        "/education/review",
+        "learner",
+        4,
+        lambda ids: {"text": "more", "course_id": ids["course"]},
+    ),
+    Scenario(
+        "PUT",
+        "/education/review/{review_id}",
+        "learner",
+        4,
+        {"text": "edited"},
+    ),
+    Scenario("GET", "/education/lesson/{lesson_id}/comments", "learner", 3),
+    Scenario("GET", "/education/lesson/{lesson_id}/thread", "learner", 3),
+    Scenario(
+        "POST",
+        "/education/lesson/{lesson_id}/comment",
+        "learner",
+        5,
+        lambda ids: {"text": "new", "parent_comment_id": ids["comment"]},
+    ),
+    Scenario(
+        "GET",
+        "/education/comment/{comment_id}/subcomments",
+        "learner",
+        2,
+    ),
+    Scenario(
+        "PUT",
+        "/education/comment/{comment_id}",
+        "learner",
+        3,
+        {"text": "edited"},
+    ),
+    Scenario("POST", "/teach/course", "author", 3, COURSE),
+    Scenario("POST", "/teach/course/import", "author", 9, EXPORT),
+    Scenario("GET", f"{TEACH}/export", "author", 4),
+    Scenario("GET", TEACH, "author", 2),
+    Scenario("PUT", TEACH, "author", 3, {"language": "en"}),
+    Scenario("POST", f"{TEACH}/chapter", "author", 4, {"name": "New"}),
+    Scenario("POST", f"{TEACH}/chapters", "author", 8, OUTLINE),
+    Scenario("GET", f"{TEACH}/chapters", "author", 2),
+    Scenario("PUT", CHAPTER, "author", 4, {"name": "Renamed"}),
+    Scenario("POST", f"{CHAPTER}/lesson", "author", 3, LESSON),
+    Scenario(
+        "POST",
+        f"{CHAPTER}/lessons",
+        "author",
+        5,
+        [LESSON] * LESSONS,
+    ),
+    Scenario("GET", f"{CHAPTER}/lessons", "author", 2),
+    Scenario(
+        "PUT",
+        f"{CHAPTER}/lesson/{{lesson_id}}",
+        "author",
+        3,
+        {"content": "edited"},
+    ),
+    Scenario("GET", "/admin/cache", "author", 0),
+    Scenario("GET", "/admin/hashing", "author", 0),
+    Scenario("GET", "/admin/slow-queries", "author", 0),
+    Scenario("GET", "/metrics", None, 0),
+    Scenario(
+        "DELETE",
+        "/education/comment/{comment_id}",
+        "learner",
+        2,
+        None,
+        204,
+    ),
+    Scenario(
+        "DELETE", "/education/review/{review_id}", "learner", 3, None, 204
+    ),
+    Scenario(
+        "DELETE",
+        f"{CHAPTER}/lesson/{{lesson_id}}",
+        "author",
+        2,
+        None,
+        204,
+        LAST_LESSON,
+    ),
+    Scenario("DELETE", CHAPTER, "author", 3, None, 204, LAST_LESSON),
+    Scenario("DELETE", TEACH, "author", 2, None, 204, {"course_id": "spare"}),
+    Scenario("DELETE", "/profile", "leaver", 1, None, 204),
+]
@@ -0,0 +1,31 @@
+"""Only configured admins read the /admin statistics."""
+
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+import pytest
+
+from .scenarios import SCENARIOS
+
+ADMIN = [
+    scenario.route
+    for scenario in SCENARIOS
+    if scenario.route.startswith("/admin/")
+]
+
+
+@pytest.mark.parametrize("path", ADMIN)
+@pytest.mark.parametrize(
+    ("user", "status_code"),
+    [("author", 200), ("learner", 403), (None, 401)],
+)
+def test_admin_routes_require_an_admin(
+    client: TestClient,
+    auth_headers: Callable[[str | None], dict[str, str]],
+    path: str,
+    user: str | None,
+    status_code: int,
+) -> None:
+    response = client.get(path, headers=auth_headers(user))
+
+    assert response.status_code == status_code
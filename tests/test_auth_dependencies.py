@@ -0,0 +1,60 @@
+"""Access tokens are decoded once per request, however many dependencies
+of a route ask for the payload.
+"""
+
+from collections.abc import Callable
+from unittest import mock
+
+from fastapi.testclient import TestClient
+import pytest
+
+from api.auth.token_service import AuthJWT
+from api.cache import LRUCache
+from api.main import Memourse
+
+LESSON = "/teach/course/{course}/chapter/{chapter}/lesson/{lesson}"
+
+
+@pytest.mark.parametrize(
+    "method, path, user, body",
+    [
+        ("PUT", "/profile", "learner", {"first_name": "Lea"}),
+        ("GET", "/education/lesson/{lesson}", "learner", None),
+        (
+            "POST",
+            "/education/lesson/{lesson}/comment",
+            "learner",
+            {"text": "new"},
+        ),
+        ("PUT", LESSON, "author", {"content": "edited"}),
+    ],
+)
+def test_token_is_decoded_once(
+    client: TestClient,
+    memourse: Memourse,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+    method: str,
+    path: str,
+    user: str,
+    body: object,
+) -> None:
+    # Without the verified token cache every validation decodes again.
+    monkeypatch.setattr(
+        memourse.auth_jwt, "verified_tokens", LRUCache(maxsize=0)
+    )
+    headers = auth_headers(user)
+
+    with mock.patch.object(
+        AuthJWT,
+        "decode_token",
+        autospec=True,
+        side_effect=AuthJWT.decode_token,
+    ) as decode_token:
+        response = client.request(
+            method, path.format(**ids), headers=headers, json=body
+        )
+
+    assert response.status_code == 200, response.text
+    assert decode_token.call_count == 1
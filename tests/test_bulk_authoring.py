@@ -0,0 +1,114 @@
+"""Bulk chapter and lesson authoring keeps the order of the request."""
+
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+from api.teaching.dependencies import MAX_BULK_LESSONS
+
+from .conftest import StatementCounter
+
+TEACH = "/teach/course/{course}"
+
+
+def lesson(name: str) -> dict[str, str]:
+    return {"name": name, "content": f"content of {name}"}
+
+
+def test_bulk_chapters_get_ordered_ids_and_their_lessons(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> None:
+    author = auth_headers("author")
+    teach = TEACH.format(**ids)
+    outline = [
+        {
+            "name": f"Bulk {chapter}",
+            "lessons": [lesson(f"{chapter}.{i}") for i in range(size)],
+        }
+        for chapter, size in enumerate((2, 0, 3, 1))
+    ]
+
+    response = client.post(f"{teach}/chapters", headers=author, json=outline)
+
+    assert response.status_code == 200, response.text
+    created = response.json()
+    chapter_ids = [chapter["id"] for chapter in created]
+    lesson_ids = [id_ for chapter in created for id_ in chapter["lesson_ids"]]
+    assert chapter_ids == sorted(chapter_ids)
+    assert lesson_ids == sorted(lesson_ids)
+    assert len(set(lesson_ids)) == 6
+
+    chapters = client.get(f"{teach}/chapters", headers=author).json()
+    names = {chapter["id"]: chapter["name"] for chapter in chapters}
+    assert [names[id_] for id_ in chapter_ids] == [
+        chapter["name"] for chapter in outline
+    ]
+    for sent, chapter in zip(outline, created):
+        lessons = client.get(
+            f"{teach}/chapter/{chapter['id']}/lessons", headers=author
+        ).json()
+        by_id = {lesson["id"]: lesson["name"] for lesson in lessons}
+        assert [by_id[id_] for id_ in chapter["lesson_ids"]] == [
+            lesson["name"] for lesson in sent["lessons"]
+        ]
+        assert set(by_id) == set(chapter["lesson_ids"])
+
+
+def test_bulk_lessons_get_ordered_ids(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> None:
+    author = auth_headers("author")
+    chapter = f"{TEACH}/chapter/{{chapter}}".format(**ids)
+    sent = [lesson(f"extra {i}") for i in range(4)]
+
+    response = client.post(f"{chapter}/lessons", headers=author, json=sent)
+
+    assert response.status_code == 200, response.text
+    lesson_ids = response.json()
+    lessons = client.get(f"{chapter}/lessons", headers=author).json()
+    by_id = {lesson["id"]: lesson["name"] for lesson in lessons}
+    assert [by_id[id_] for id_ in lesson_ids] == [
+        lesson["name"] for lesson in sent
+    ]
+
+
+def test_bulk_insert_statements_do_not_grow_with_rows(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+    counter: StatementCounter,
+) -> None:
+    author = auth_headers("author")
+    teach = TEACH.format(**ids)
+    statements = []
+    for size in (1, 20):
+        counter.reset()
+        response = client.post(
+            f"{teach}/chapters",
+            headers=author,
+            json=[{"name": "Grow", "lessons": [lesson("x")] * size}] * size,
+        )
+        assert response.status_code == 200, response.text
+        statements.append(counter.statements)
+
+    assert statements[0] == statements[1]
+
+
+def test_bulk_chapters_cap_the_total_of_lessons(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> None:
+    half = MAX_BULK_LESSONS // 2 + 1
+    response = client.post(
+        f"{TEACH}/chapters".format(**ids),
+        headers=auth_headers("author"),
+        json=[{"name": "Huge", "lessons": [lesson("x")] * half}] * 2,
+    )
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Too many lessons in one request"}
@@ -0,0 +1,100 @@
+"""Full-text search ranks by BM25 and pages by ``(rank, id)``."""
+
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+import pytest
+
+COURSE = {"language": "en", "date_started": "2030-01-01"}
+
+
+@pytest.fixture(scope="module")
+def search(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> Callable[..., dict]:
+    """Search as the learner, who is enrolled in ``course`` only."""
+    author = auth_headers("author")
+    for name in (
+        "Applied quantum ideas for everyday practical work",
+        "Quantum quantum quantum",
+        "Quantum chemistry lab",
+        "Zeta 1",
+        "Zeta 2",
+        "Zeta 3",
+        "Zeta 4",
+        "Zeta 5",
+    ):
+        created = client.post(
+            "/teach/course", headers=author, json={**COURSE, "name": name}
+        )
+        assert created.status_code == 200, created.text
+
+    for course in ("course", "spare"):
+        chapter = client.post(
+            f"/teach/course/{ids[course]}/chapter",
+            headers=author,
+            json={"name": "Nebula"},
+        ).json()["id"]
+        lesson = client.post(
+            f"/teach/course/{ids[course]}/chapter/{chapter}/lesson",
+            headers=author,
+            json={"name": f"Nebula in {course}", "content": "nebula"},
+        )
+        assert lesson.status_code == 200, lesson.text
+
+    learner = auth_headers("learner")
+
+    def search(q: str, **params: object) -> dict:
+        response = client.get(
+            "/catalog/search", headers=learner, params={"q": q, **params}
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return search
+
+
+def names(page: dict) -> list[str]:
+    return [hit["name"] for hit in page["hits"]]
+
+
+def test_hits_are_ordered_by_bm25(search: Callable[..., dict]) -> None:
+    assert names(search("quantum")) == [
+        "Quantum quantum quantum",
+        "Quantum chemistry lab",
+        "Applied quantum ideas for everyday practical work",
+    ]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_cursor_pages_are_stable(
+    search: Callable[..., dict], limit: int
+) -> None:
+    everything = search("zeta", limit=100)["hits"]
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": limit}
+        if cursor is not None:
+            params["cursor"] = cursor
+        page = search("zeta", **params)
+        pages.append(page["hits"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [hit for page in pages for hit in page] == everything
+    assert [len(page) for page in pages[:-1]] == [limit] * (len(pages) - 1)
+    # Equal ranks fall back to the id, so ties keep the creation order.
+    assert names({"hits": everything}) == [f"Zeta {i}" for i in range(1, 6)]
+
+
+def test_lesson_hits_are_limited_to_enrollments(
+    search: Callable[..., dict], ids: dict[str, int]
+) -> None:
+    page = search("nebula", scope="lessons")
+
+    assert names(page) == ["Nebula in course"]
+    assert [hit["course_id"] for hit in page["hits"]] == [ids["course"]]
@@ -0,0 +1,53 @@
+"""Paging of top-level comments in lesson threads."""
+
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+import pytest
+
+from .conftest import PEERS
+
+# The learner and every peer left one comment, replied to three times.
+ROOTS = PEERS + 1
+
+
+def fetch_pages(
+    client: TestClient, path: str, headers: dict[str, str], limit: int
+) -> list[dict]:
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": limit}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = client.get(path, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = pages[-1]["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize(
+    "limit, sizes", [(4, [4, 4, 3]), (ROOTS, [ROOTS]), (100, [ROOTS])]
+)
+def test_thread_pages_end_without_an_empty_page(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+    limit: int,
+    sizes: list[int],
+) -> None:
+    pages = fetch_pages(
+        client,
+        f"/education/lesson/{ids['lesson']}/thread",
+        auth_headers("learner"),
+        limit,
+    )
+
+    assert [len(page["comments"]) for page in pages] == sizes
+    roots = [comment for page in pages for comment in page["comments"]]
+    assert [root["id"] for root in roots] == sorted(
+        {root["id"] for root in roots}
+    )
+    assert all(len(root["replies"]) == 3 for root in roots)
@@ -0,0 +1,72 @@
+"""Cached compressed bodies always match the response being sent."""
+
+from collections.abc import Iterator
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+import pytest
+
+from api.cache import compressed_response_cache
+from api.middlewares import CompressionMiddleware
+
+OLD = b"OLD CONTENT " * 100
+NEW = b"BRAND NEW CONTENT " * 100
+
+
+@pytest.fixture
+def app() -> Iterator[FastAPI]:
+    """``/lesson`` sends ``OLD`` then ``NEW`` under the same ETag."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=64)
+    bodies = [OLD, NEW]
+
+    @app.get("/lesson")
+    async def lesson() -> Response:
+        return Response(
+            bodies.pop(0), media_type="text/plain", headers={"ETag": '"1"'}
+        )
+
+    @app.get("/small")
+    async def small() -> dict[str, bool]:
+        return {"small": True}
+
+    @app.get("/image")
+    async def image() -> Response:
+        return Response(OLD, media_type="image/png")
+
+    yield app
+    compressed_response_cache.clear()
+
+
+def test_same_etag_with_new_body_is_compressed_again(app: FastAPI) -> None:
+    with TestClient(app) as client:
+        old, new = (
+            client.get("/lesson", headers={"Accept-Encoding": "gzip"})
+            for _ in range(2)
+        )
+
+    assert old.headers["content-encoding"] == "gzip"
+    assert new.headers["content-encoding"] == "gzip"
+    assert old.content == OLD
+    assert new.content == NEW
+
+
+@pytest.mark.parametrize(
+    ("path", "accept_encoding", "vary"),
+    [
+        ("/lesson", "gzip", "Accept-Encoding"),
+        ("/lesson", "", "Accept-Encoding"),
+        ("/lesson", "identity", "Accept-Encoding"),
+        ("/small", "gzip", "Accept-Encoding"),
+        ("/image", "gzip", None),
+    ],
+)
+def test_compressible_responses_always_vary_on_accept_encoding(
+    app: FastAPI, path: str, accept_encoding: str, vary: str | None
+) -> None:
+    with TestClient(app) as client:
+        response = client.get(
+            path, headers={"Accept-Encoding": accept_encoding}
+        )
+
+    assert response.headers.get("vary") == vary
@@ -0,0 +1,127 @@
+"""Limits of the streamed NDJSON course import."""
+
+from collections.abc import Callable, Iterator
+import json
+
+from fastapi.testclient import TestClient
+import pytest
+
+from api.teaching.service import MAX_IMPORT_LINE_SIZE
+
+from .conftest import StatementCounter
+from .scenarios import EXPORT
+
+
+def export(name: str, chapters: int, lessons: int, **course: object) -> bytes:
+    """A course with ``chapters`` chapters of ``lessons`` lessons each."""
+    lines = [
+        {
+            "type": "course",
+            "id": 1,
+            "name": name,
+            "date_started": "2030-01-01",
+            "language": "en",
+            "chapters_sequense": list(range(1, chapters + 1)),
+            **course,
+        },
+        *(
+            {
+                "type": "chapter",
+                "id": chapter,
+                "name": f"Chapter {chapter}",
+                "lessons_sequence": [
+                    (chapter - 1) * lessons + i for i in range(1, lessons + 1)
+                ],
+            }
+            for chapter in range(1, chapters + 1)
+        ),
+        *(
+            {
+                "type": "lesson",
+                "id": (chapter - 1) * lessons + i,
+                "chapter_id": chapter,
+                "name": f"Lesson {chapter}.{i}",
+                "content": "text",
+            }
+            for chapter in range(1, chapters + 1)
+            for i in range(1, lessons + 1)
+        ),
+    ]
+    return b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+
+
+def without_newline(size: int) -> Iterator[bytes]:
+    chunk = b"x" * 65536
+    for _ in range(size // len(chunk)):
+        yield chunk
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        lambda: without_newline(2 * MAX_IMPORT_LINE_SIZE),
+        lambda: EXPORT + b"x" * (MAX_IMPORT_LINE_SIZE + 1) + b"\n",
+    ],
+    ids=["streamed", "after valid lines"],
+)
+def test_import_rejects_overlong_lines(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+    content: Callable[[], bytes | Iterator[bytes]],
+) -> None:
+    response = client.post(
+        "/teach/course/import",
+        headers=auth_headers("author"),
+        content=content(),
+    )
+
+    assert response.status_code == 413, response.text
+    courses = client.get("/catalog", headers=auth_headers("author"))
+    assert "Course" in courses.text and "Imported" not in courses.text
+
+
+def test_import_inserts_in_batches(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+    counter: StatementCounter,
+) -> None:
+    author = auth_headers("author")
+    statements = []
+    for size in (1, 20):
+        counter.reset()
+        response = client.post(
+            "/teach/course/import",
+            headers=author,
+            content=export(f"Batched {size}", size, size),
+        )
+        assert response.status_code == 200, response.text
+        statements.append(counter.statements)
+
+    assert statements[0] == statements[1]
+    course = response.json()
+    outline = client.get(
+        f"/teach/course/{course['id']}/chapters", headers=author
+    ).json()
+    assert [chapter["id"] for chapter in outline] == course[
+        "chapters_sequense"
+    ]
+    assert [chapter["name"] for chapter in outline] == [
+        f"Chapter {chapter}" for chapter in range(1, 21)
+    ]
+
+
+def test_import_rejects_a_start_date_in_the_past(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> None:
+    response = client.post(
+        "/teach/course/import",
+        headers=auth_headers("author"),
+        content=export("Past", 1, 1, date_started="2001-01-01"),
+    )
+
+    assert response.status_code == 409
+    assert response.json() == {"detail": "Date is incorrect"}
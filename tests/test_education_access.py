@@ -0,0 +1,84 @@
+"""Access checks of education routes come from the in-process caches."""
+
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+from api.cache import caches, enrollment_cache
+
+from .conftest import StatementCounter
+
+TEACH = "/teach/course/{course}"
+
+
+def test_warm_access_check_runs_no_queries(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+    counter: StatementCounter,
+) -> None:
+    learner = auth_headers("learner")
+    for cache in caches.values():
+        cache.clear()
+    for path in (
+        "/education/chapter/{chapter}/lessons",
+        "/education/lesson/{lesson}",
+    ):
+        client.get(path.format(**ids), headers=learner)
+
+    counter.reset()
+    lessons = client.get(
+        "/education/chapter/{chapter}/lessons".format(**ids), headers=learner
+    )
+    assert lessons.status_code == 200
+    assert counter.statements == 1
+
+    counter.reset()
+    thread = client.get(
+        "/education/lesson/{lesson}/thread".format(**ids), headers=learner
+    )
+    assert thread.status_code == 200
+    assert counter.statements == 1
+
+
+def test_deleted_chapter_is_not_served_from_cache(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> None:
+    learner = auth_headers("learner")
+    lessons = "/education/chapter/{last_chapter}/lessons".format(**ids)
+    assert client.get(lessons, headers=learner).status_code == 200
+
+    deleted = client.delete(
+        f"{TEACH}/chapter/{{last_chapter}}".format(**ids),
+        headers=auth_headers("author"),
+    )
+    assert deleted.status_code == 204
+
+    assert client.get(lessons, headers=learner).status_code == 404
+
+
+def test_deleted_course_drops_cached_enrollments(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> None:
+    learner = auth_headers("learner")
+    enrolled = client.post(
+        "/education/add-course",
+        headers=learner,
+        json={"course_id": ids["spare"], "text": ""},
+    )
+    assert enrolled.status_code == 201, enrolled.text
+    outline = client.get(
+        f"/education/course/{ids['spare']}/outline", headers=learner
+    )
+    assert outline.status_code == 200
+
+    deleted = client.delete(
+        f"/teach/course/{ids['spare']}", headers=auth_headers("author")
+    )
+    assert deleted.status_code == 204
+
+    assert ids["spare"] not in (enrollment_cache.get(ids["learner"]) or ())
@@ -0,0 +1,61 @@
+"""ETags of lessons and courses never match a deleted row's."""
+
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+CHAPTER = "/teach/course/{course}/chapter/{chapter}"
+
+
+def test_lesson_recreated_after_delete_gets_new_etag(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> None:
+    author = auth_headers("author")
+    learner = auth_headers("learner")
+    chapter = CHAPTER.format(**ids)
+
+    old = client.post(
+        f"{chapter}/lesson",
+        headers=author,
+        json={"name": "Old", "content": "OLD CONTENT"},
+    ).json()
+    old_etag = client.get(
+        f"/education/lesson/{old['id']}", headers=learner
+    ).headers["etag"]
+    deleted = client.delete(f"{chapter}/lesson/{old['id']}", headers=author)
+    assert deleted.status_code == 204
+    new = client.post(
+        f"{chapter}/lesson",
+        headers=author,
+        json={"name": "New", "content": "BRAND NEW CONTENT"},
+    ).json()
+
+    assert new["id"] != old["id"]
+    response = client.get(
+        f"/education/lesson/{new['id']}",
+        headers={**learner, "If-None-Match": old_etag},
+    )
+    assert response.status_code == 200
+    assert response.json()["content"] == "BRAND NEW CONTENT"
+
+
+def test_course_recreated_after_delete_gets_new_id(
+    client: TestClient,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+) -> None:
+    author = auth_headers("author")
+    course = {"language": "en", "date_started": "2030-01-01"}
+
+    old = client.post(
+        "/teach/course", headers=author, json={**course, "name": "Old"}
+    ).json()
+    deleted = client.delete(f"/teach/course/{old['id']}", headers=author)
+    assert deleted.status_code == 204
+    new = client.post(
+        "/teach/course", headers=author, json={**course, "name": "New"}
+    ).json()
+
+    assert new["id"] != old["id"]
@@ -0,0 +1,48 @@
+"""Requests waiting for password hashing hold no database connection."""
+
+from collections.abc import Callable
+from typing import TypeVar
+
+from fastapi.testclient import TestClient
+import pytest
+
+from api.auth.hashing import hashing_executor
+from api.main import Memourse
+
+T = TypeVar("T")
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/auth/jwt/create", {"username": "learner", "password": "password"}),
+        (
+            "/auth/register",
+            {
+                "username": "new",
+                "email": "new@example.com",
+                "password": "password",
+            },
+        ),
+    ],
+)
+def test_connection_is_released_before_hashing(
+    client: TestClient,
+    memourse: Memourse,
+    ids: dict[str, int],
+    monkeypatch: pytest.MonkeyPatch,
+    path: str,
+    body: dict[str, str],
+) -> None:
+    run = hashing_executor.run
+    checked_out = []
+
+    async def tracked_run(func: Callable[..., T], *args: object) -> T:
+        checked_out.append(memourse.db.engine.pool.checkedout())
+        return await run(func, *args)
+
+    monkeypatch.setattr(hashing_executor, "run", tracked_run)
+    response = client.post(path, json=body)
+
+    assert response.status_code == 200, response.text
+    assert checked_out == [0]
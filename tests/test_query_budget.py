@@ -0,0 +1,59 @@
+"""SQL query budget of every API route.
+
+Each route is called once with cold caches. The test fails when it runs
+more statements than its budget, so N+1 regressions fail CI. Run with
+``--query-table`` to print the counts of every route.
+"""
+
+from collections.abc import Callable
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+import pytest
+
+from api.cache import caches
+from api.main import Memourse
+
+from .conftest import StatementCounter
+from .scenarios import Scenario, SCENARIOS
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=str)
+def test_route_stays_within_query_budget(
+    client: TestClient,
+    memourse: Memourse,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+    counter: StatementCounter,
+    query_table: list[tuple[str, int, int, int]],
+    scenario: Scenario,
+) -> None:
+    user = None if scenario.user == "refresh" else scenario.user
+    for cache in caches.values():
+        cache.clear()
+    counter.reset()
+
+    response = client.request(
+        scenario.method,
+        scenario.path(ids),
+        headers=auth_headers(user),
+        **scenario.content(ids, memourse.auth_jwt),
+    )
+
+    query_table.append(
+        (str(scenario), counter.statements, scenario.budget, counter.rows)
+    )
+    assert response.status_code == scenario.status, response.text
+    assert counter.statements <= scenario.budget
+
+
+def test_every_route_has_a_scenario(memourse: Memourse) -> None:
+    covered = {(scenario.method, scenario.route) for scenario in SCENARIOS}
+    uncovered = sorted(
+        (method, route.path)
+        for route in memourse.create_app().routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+        if (method, route.path) not in covered
+    )
+    assert uncovered == []
@@ -0,0 +1,61 @@
+"""Index use of the statements behind every API route.
+
+Every statement counts as slow here, so the slow query log captures the
+``EXPLAIN QUERY PLAN`` of each one, and no plan may scan a whole table.
+"""
+
+from collections.abc import Callable, Iterator
+import logging
+
+from fastapi.testclient import TestClient
+import pytest
+
+from api.cache import caches
+from api.main import Memourse
+from api.slow_queries import full_scans, slow_query_log, SlowQueryLog
+
+from .scenarios import Scenario, SCENARIOS
+
+
+@pytest.fixture(scope="module")
+def plans(memourse: Memourse) -> Iterator[SlowQueryLog]:
+    threshold = slow_query_log.threshold
+    maxlen = slow_query_log.entries.maxlen
+    logger = logging.getLogger("api.slow_queries")
+    # Keep the plans, but not a JSON line per statement in the report.
+    logger.propagate = False
+    logger.addHandler(handler := logging.NullHandler())
+    slow_query_log.configure(threshold=0, maxlen=10000)
+    yield slow_query_log
+    slow_query_log.configure(threshold, maxlen)
+    logger.removeHandler(handler)
+    logger.propagate = True
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=str)
+def test_statements_use_indexes(
+    client: TestClient,
+    memourse: Memourse,
+    ids: dict[str, int],
+    auth_headers: Callable[[str | None], dict[str, str]],
+    plans: SlowQueryLog,
+    scenario: Scenario,
+) -> None:
+    user = None if scenario.user == "refresh" else scenario.user
+    for cache in caches.values():
+        cache.clear()
+    plans.entries.clear()
+
+    client.request(
+        scenario.method,
+        scenario.path(ids),
+        headers=auth_headers(user),
+        **scenario.content(ids, memourse.auth_jwt),
+    )
+
+    for entry in plans.entries:
+        if entry["plan"] is not None:
+            assert full_scans(entry["plan"]) == [], (
+                entry["statement"],
+                entry["plan"],
+            )
@@ -0,0 +1,206 @@
+"""Captured traces hold no secrets and replay with the captured statuses."""
+
+import asyncio
+from collections.abc import Iterator
+import json
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+import pytest
+
+from api.cache import caches
+from api.main import Memourse
+from benchmarks.loadtest import ASGIClient
+from benchmarks.replay import (
+    ClientPool,
+    copy_database,
+    load_traces,
+    Placeholders,
+    Replayer,
+)
+
+from .conftest import seed
+
+SECRETS = {
+    "password": "correct horse battery staple",
+    "comment": "my cat walked over the keyboard",
+    "course": "Secret course",
+    "description": "Nobody should read this",
+    "email": "newcomer@example.com",
+    "birthday": "1999-04-01",
+}
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp("db") / "test.db"
+
+
+@pytest.fixture(scope="module")
+def trace_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp("traces") / "traces.jsonl"
+
+
+@pytest.fixture(scope="module")
+def memourse(database: Path, trace_file: Path) -> Memourse:
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("DBURL", f"sqlite+aiosqlite:///{database}")
+        patch.setenv("TRAFFICCAPTUREFILE", str(trace_file))
+        return Memourse()
+
+
+@pytest.fixture(scope="module")
+def captured(memourse: Memourse) -> Iterator[dict[str, object]]:
+    """Log in, refresh, comment, search, author a course and register.
+
+    Leaving the client shuts the app down, which writes out the traces.
+    """
+    with TestClient(memourse.create_app()) as client:
+        ids = client.portal.call(seed, memourse)
+
+        def login(username: str) -> dict[str, str]:
+            response = client.post(
+                "/auth/jwt/create",
+                json={"username": username, "password": "password"},
+            )
+            assert response.status_code == 200, response.text
+            return response.json()
+
+        learner = login("learner")
+        author = login("author")
+        refreshed = client.post(
+            "/auth/jwt/refresh", json={"refresh": learner["refresh"]}
+        )
+        assert refreshed.status_code == 200, refreshed.text
+
+        learner_headers = {"Authorization": f"Bearer {learner['access']}"}
+        author_headers = {"Authorization": f"Bearer {author['access']}"}
+        requests = [
+            client.post(
+                f"/education/lesson/{ids['lesson']}/comment",
+                headers=learner_headers,
+                json={"text": SECRETS["comment"]},
+            ),
+            client.get(
+                "/catalog/search",
+                headers=learner_headers,
+                params={"q": "Lesson Course"},
+            ),
+            client.post(
+                "/teach/course",
+                headers=author_headers,
+                json={
+                    "name": SECRETS["course"],
+                    "description": SECRETS["description"],
+                    "language": "en",
+                    "date_started": "2030-01-01",
+                },
+            ),
+            client.post(
+                "/auth/register",
+                json={
+                    "username": "newcomer",
+                    "email": SECRETS["email"],
+                    "birthday": SECRETS["birthday"],
+                    "password": SECRETS["password"],
+                },
+            ),
+        ]
+        for response in requests:
+            assert response.status_code == 200, response.text
+
+        client.portal.call(memourse.db.read_engine.dispose)
+        client.portal.call(memourse.db.engine.dispose)
+    for cache in caches.values():
+        cache.clear()
+    yield {
+        "ids": ids,
+        "tokens": [
+            learner["access"],
+            learner["refresh"],
+            author["access"],
+            author["refresh"],
+            refreshed.json()["access"],
+        ],
+    }
+
+
+def test_traces_hold_no_tokens_or_body_text(
+    captured: dict[str, object], trace_file: Path
+) -> None:
+    text = trace_file.read_text()
+    for secret in [*captured["tokens"], *SECRETS.values(), "newcomer"]:
+        assert secret not in text
+
+    traces = {
+        (trace["method"], trace["route"]): trace
+        for trace in map(json.loads, text.splitlines())
+    }
+    ids = captured["ids"]
+    assert traces["POST", "/auth/jwt/create"]["body"] == {
+        "username": "<username>",
+        "password": "<password>",
+    }
+    assert traces["POST", "/auth/jwt/refresh"] == {
+        **traces["POST", "/auth/jwt/refresh"],
+        "body": {"refresh": "<token>"},
+        "user": ids["learner"],
+    }
+    assert traces["POST", "/education/lesson/{lesson_id}/comment"] == {
+        **traces["POST", "/education/lesson/{lesson_id}/comment"],
+        "body": {"text": f"<text:{len(SECRETS['comment'])}>"},
+        "user": ids["learner"],
+    }
+    assert traces["GET", "/catalog/search"]["query"] == {"q": "<search:2>"}
+    assert traces["POST", "/teach/course"]["body"] == {
+        "name": f"<text:{len(SECRETS['course'])}>",
+        "description": f"<text:{len(SECRETS['description'])}>",
+        "language": "en",
+        "date_started": "<date>",
+    }
+    assert traces["POST", "/auth/register"]["body"] == {
+        "username": "<username>",
+        "email": "<email>",
+        "birthday": "<date>",
+        "password": "<password>",
+    }
+
+
+def test_logins_record_the_user_they_authenticate(
+    captured: dict[str, object], trace_file: Path
+) -> None:
+    logins = [
+        trace["user"]
+        for trace in load_traces(str(trace_file))
+        if trace["route"] == "/auth/jwt/create"
+    ]
+    ids = captured["ids"]
+    assert logins == [ids["learner"], ids["author"]]
+
+
+def test_replay_reproduces_the_captured_statuses(
+    captured: dict[str, object], database: Path, trace_file: Path
+) -> None:
+    traces = load_traces(str(trace_file))
+    db = copy_database(str(database))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("DBURL", f"sqlite+aiosqlite:///{db}")
+        patch.delenv("TRAFFICCAPTUREFILE", raising=False)
+        replica = Memourse()
+    placeholders = Placeholders(
+        db, {trace["user"] for trace in traces} - {None}, "password"
+    )
+
+    async def replay() -> Replayer:
+        client = ASGIClient(replica.create_app())
+        replayer = Replayer(ClientPool(lambda: client), placeholders, 1000)
+        await replayer.replay(traces)
+        await replica.db.read_engine.dispose()
+        await replica.db.engine.dispose()
+        return replayer
+
+    replayer = asyncio.run(replay())
+    for cache in caches.values():
+        cache.clear()
+    assert len(traces) == 7
+    assert replayer.mismatches == 0